@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Compares compact models, whose properties are stored in slots, against dict-backed models: the memory held by a
+list of models, the time to construct them and the time to encode them as JSON with the representation of the Api.
+
+Run with: PYTHONPATH=. python benchmarks/bench_compact.py
+"""
+import gc
+import json
+import time
+import tracemalloc
+
+from flask_restful_swagger_3 import Schema, _encode_model
+
+MODELS = 50000
+
+PROPERTIES = {
+    'id': {
+        'type': 'integer'
+    },
+    'name': {
+        'type': 'string'
+    },
+    'active': {
+        'type': 'boolean'
+    },
+    'score': {
+        'type': 'number'
+    }
+}
+
+
+class UserModel(Schema):
+    type = 'object'
+    properties = PROPERTIES
+    required = ['id']
+
+
+class CompactUserModel(Schema, compact=True):
+    type = 'object'
+    properties = PROPERTIES
+    required = ['id']
+
+
+RECORDS = [{'id': i, 'name': 'user{0}'.format(i), 'active': i % 2 == 0, 'score': i / 2} for i in range(MODELS)]
+
+
+def construct(model):
+    return [model(**record) for record in RECORDS]
+
+
+def measure_memory(model):
+    """Returns the bytes allocated by a list of models. The values of their properties are shared with the records."""
+    gc.collect()
+    tracemalloc.start()
+    models = construct(model)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del models
+    return size
+
+
+def measure_time(f):
+    times = []
+    for _ in range(5):
+        start = time.perf_counter()
+        f()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    for model in (UserModel, CompactUserModel):
+        models = construct(model)
+        memory = measure_memory(model)
+        construct_time = measure_time(lambda: construct(model))
+        encode_time = measure_time(lambda: json.dumps(models, default=_encode_model))
+        print('{0:16} {1} models: {2:6.1f} MB, construct {3:6.3f} s, encode {4:6.3f} s'.format(
+            model.__name__, MODELS, memory / 1e6, construct_time, encode_time))
+
+
+if __name__ == '__main__':
+    main()
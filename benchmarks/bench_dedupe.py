@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Measures the effect of `swagger.dedupe_schemas` on a document whose operations repeat the same inline schemas:
+the size of the serialized document and the memory held once the pass has run.
+
+The operation objects of the document are kept alive, like the documentation of the resources which the path
+items of an Api refer to. The pass does not modify them, it copies the path items containing moved schemas, so it
+shrinks the serialized document but the memory held grows by the copies.
+
+Run with: PYTHONPATH=. python benchmarks/bench_dedupe.py
+"""
+import gc
+import json
+import tracemalloc
+
+from flask_restful_swagger_3 import swagger
+
+OPERATIONS = 500
+
+
+def make_operation():
+    return {
+        'responses': {
+            '200': {
+                'description': 'Page of items',
+                'content': {'application/json': {'schema': {
+                    'type': 'object',
+                    'properties': {
+                        'data': {'type': 'array', 'items': {'type': 'object'}},
+                        'page': {'type': 'integer', 'minimum': 1},
+                        'per_page': {'type': 'integer', 'minimum': 1, 'maximum': 100},
+                        'total': {'type': 'integer', 'minimum': 0}
+                    }
+                }}}
+            },
+            '400': {
+                'description': 'Error',
+                'content': {'application/json': {'schema': {
+                    'type': 'object',
+                    'properties': {
+                        'code': {'type': 'integer'},
+                        'message': {'type': 'string'},
+                        'details': {'type': 'array', 'items': {'type': 'string'}}
+                    }
+                }}}
+            }
+        }
+    }
+
+
+def measure(dedupe):
+    """Returns the size of the serialized document and the bytes held by it and the operation objects."""
+    gc.collect()
+    tracemalloc.start()
+    operations = [make_operation() for _ in range(OPERATIONS)]
+    swagger_object = {
+        'paths': {'/items{0}'.format(i): {'get': operation} for i, operation in enumerate(operations)},
+        'components': {'schemas': {}}
+    }
+    if dedupe:
+        swagger.dedupe_schemas(swagger_object)
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return len(json.dumps(swagger_object)), memory
+
+
+def main():
+    for dedupe in (False, True):
+        size, memory = measure(dedupe)
+        print('{0} operations, dedupe_schemas={1!s:5}: document {2:6.1f} kB, memory held {3:6.2f} MB'.format(
+            OPERATIONS, dedupe, size / 1e3, memory / 1e6))
+
+
+if __name__ == '__main__':
+    main()
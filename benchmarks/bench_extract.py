@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Compares the extraction of a synthetic graph of schema models with the worklist extractor against the previous
+recursive implementation, which walked the models again wherever they appeared.
+
+Every model of the graph nests the two models following it, so the recursive implementation walks an exponential
+number of paths; it is only run on the first models of the graph. Recursive models are only supported by the
+worklist extractor.
+
+Run with: PYTHONPATH=. python benchmarks/bench_extract.py
+"""
+import copy
+import inspect
+import time
+
+from flask_restful_swagger_3 import Extractor, Schema, swagger
+
+MODELS = 1000
+
+LEGACY_MODELS = 22
+
+
+class LegacyExtractor(object):
+    """The recursive extractor implementation."""
+
+    def extract_schemas(self, obj):
+        definitions = {}
+        if isinstance(obj, list):
+            for i, o in enumerate(obj):
+                obj[i], definitions_ = self.extract_schemas(o)
+                definitions.update(definitions_)
+
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                obj[k], definitions_ = self.extract_schemas(v)
+                definitions.update(definitions_)
+
+        if inspect.isclass(obj):
+            definition = copy.deepcopy(obj.definitions())
+            description = swagger.parse_schema_doc(obj, definition)
+            if description:
+                definition['description'] = description
+            definition, additional_definitions = self.extract_schemas(definition)
+            definitions[obj.__name__] = definition
+            definitions.update(additional_definitions)
+            obj = obj.reference()
+        return obj, definitions
+
+
+def make_models(count, recursive):
+    """Returns `count` models, each nesting the two following ones and, if recursive, the first one."""
+    models = [type('GraphModel{0}'.format(i), (Schema,), {'type': 'object'}) for i in range(count)]
+    for i, model in enumerate(models):
+        properties = {'id': {'type': 'integer'}}
+        if i + 1 < count:
+            properties['next'] = models[i + 1]
+        if i + 2 < count:
+            properties['items'] = models[i + 2].array()
+        if recursive:
+            properties['root'] = models[0]
+        model.properties = properties
+    return models
+
+
+def operation(model):
+    return {'responses': {'200': {'description': 'Model', 'content': {'application/json': {'schema': model}}}}}
+
+
+def bench(extract, count, recursive=False):
+    models = make_models(count, recursive)
+    Extractor.invalidate()
+    start = time.perf_counter()
+    _, definitions = extract(operation(models[0]))
+    elapsed = time.perf_counter() - start
+    assert len(definitions) == count
+    return elapsed
+
+
+def main():
+    legacy_time = bench(LegacyExtractor().extract_schemas, LEGACY_MODELS)
+    worklist_time = bench(Extractor.extract, LEGACY_MODELS)
+    print('{0} models, recursive extractor: {1:8.3f} s'.format(LEGACY_MODELS, legacy_time))
+    print('{0} models, worklist extractor:  {1:8.3f} s'.format(LEGACY_MODELS, worklist_time))
+
+    print('')
+    print('{0} models, worklist extractor:             {1:8.3f} s'.format(MODELS, bench(Extractor.extract, MODELS)))
+    print('{0} models with cycles, worklist extractor: {1:8.3f} s'.format(
+        MODELS, bench(Extractor.extract, MODELS, recursive=True)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Compares the construction cost of schema models with compiled validators against the previous
+implementation, which compared the property types on every construction, the cost of constructing
+models one by one against `Schema.from_records`, and the cost of `Schema.trusted` with and without sampled
+validation.
+
+Run with: PYTHONPATH=. python benchmarks/bench_schema.py
+"""
+import timeit
+
+import flask_restful_swagger_3
+from flask_restful_swagger_3 import Schema
+
+PROPERTIES = {
+    'id': {
+        'type': 'integer',
+        'format': 'int64'
+    },
+    'name': {
+        'type': 'string'
+    },
+    'score': {
+        'type': 'number'
+    },
+    'active': {
+        'type': 'boolean'
+    },
+    'role': {
+        'type': 'string',
+        'enum': ['admin', 'user']
+    },
+    'born': {
+        'type': 'string',
+        'format': 'date'
+    }
+}
+
+RECORD = {'id': 1, 'name': 'somebody', 'score': 1.5, 'active': True, 'role': 'user', 'born': '2000-01-01'}
+
+NUMBER = 100000
+
+BATCH_SIZE = 100000
+
+
+class LegacySchema(dict):
+    """The schema model implementation without compiled validators."""
+    properties = None
+
+    def __init__(self, **kwargs):
+        if self.properties:
+            for k, v in kwargs.items():
+                if k not in self.properties:
+                    raise ValueError(
+                            'The model "{0}" does not have an attribute "{1}"'.format(self.__class__.__name__, k))
+                if 'type' in self.properties[k]:
+                    type_ = self.properties[k]['type']
+                    if type_ == 'integer' and not isinstance(v, int):
+                        raise ValueError('The attribute "{0}" must be an int, but was "{1}"'.format(k, type(v)))
+                    if type_ == 'number' and not isinstance(v, int) and not isinstance(v, float):
+                        raise ValueError(
+                                'The attribute "{0}" must be an int or float, but was "{1}"'.format(k, type(v)))
+                    if type_ == 'string' and not isinstance(v, str):
+                        raise ValueError('The attribute "{0}" must be a string, but was "{1}"'.format(k, type(v)))
+                    if type_ == 'boolean' and not isinstance(v, bool):
+                        raise ValueError('The attribute "{0}" must be an int, but was "{1}"'.format(k, type(v)))
+                self[k] = v
+
+        if hasattr(self, 'required'):
+            for key in self.required:
+                if key not in kwargs:
+                    raise ValueError('The attribute "{0}" is required'.format(key))
+
+
+class LegacyUserModel(LegacySchema):
+    type = 'object'
+    properties = PROPERTIES
+    required = ['id', 'name']
+
+
+class UserModel(Schema):
+    type = 'object'
+    properties = PROPERTIES
+    required = ['id', 'name']
+
+
+class TypedUserModel(Schema):
+    """The same model, checking the property types only."""
+    type = 'object'
+    properties = {k: {'type': v['type']} for k, v in PROPERTIES.items()}
+    required = ['id', 'name']
+
+
+def bench(construct):
+    return min(timeit.repeat(lambda: construct(**RECORD), number=NUMBER, repeat=5)) / NUMBER * 1e6
+
+
+def main():
+    legacy_time = bench(LegacyUserModel)
+    typed_time = bench(TypedUserModel)
+    compiled_time = bench(UserModel)
+
+    print('legacy schema (type checks only):        {0:6.2f} us/instance'.format(legacy_time))
+    print('compiled schema (type checks only):      {0:6.2f} us/instance'.format(typed_time))
+    print('compiled schema (type, enum and format): {0:6.2f} us/instance'.format(compiled_time))
+    print('speedup of type checks:                  {0:6.2f}x'.format(legacy_time / typed_time))
+
+    records = [dict(RECORD, id=i) for i in range(BATCH_SIZE)]
+    loop_time = min(timeit.repeat(lambda: [UserModel(**record) for record in records], number=1, repeat=3))
+    batch_time = min(timeit.repeat(lambda: UserModel.from_records(records), number=1, repeat=3))
+
+    print('')
+    print('{0} records, one by one:                {1:6.3f} s'.format(BATCH_SIZE, loop_time))
+    print('{0} records, from_records:              {1:6.3f} s'.format(BATCH_SIZE, batch_time))
+    print('speedup of batch construction:           {0:6.2f}x'.format(loop_time / batch_time))
+
+    print('')
+    for rate in (0, 0.01, 0.1):
+        flask_restful_swagger_3.trusted_sample_rate = rate
+        print('trusted schema, sample rate {0:<4}:         {1:6.2f} us/instance'.format(rate, bench(UserModel.trusted)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+Compares the cost of registering resources with an eager Api, which builds the swagger document in
+`add_resource`, against a lazy Api, which builds it on the first request for the document.
+
+Run with: PYTHONPATH=. python benchmarks/bench_startup.py
+"""
+import time
+
+from flask import Flask
+
+from flask_restful_swagger_3 import Api, Resource, Schema, swagger
+
+RESOURCES = 500
+
+
+class ErrorModel(Schema):
+    """An error shared by all operations."""
+    type = 'object'
+    properties = {
+        'code': {
+            'type': 'integer'
+        },
+        'message': {
+            'type': 'string'
+        }
+    }
+
+
+class ItemModel(Schema):
+    type = 'object'
+    properties = {
+        'id': {
+            'type': 'integer'
+        },
+        'name': {
+            'type': 'string'
+        },
+        'error': ErrorModel
+    }
+    required = ['id']
+
+
+def make_resources():
+    """Returns new resource classes, as the documentation of a resource is modified when it is registered."""
+    resources = []
+    for i in range(RESOURCES):
+        @swagger.doc({
+            'tags': ['items'],
+            'parameters': [
+                {
+                    'name': 'item_id',
+                    'in': 'path',
+                    'required': True,
+                    'schema': {
+                        'type': 'integer'
+                    }
+                }
+            ],
+            'responses': {
+                '200': {
+                    'description': 'Item',
+                    'content': {'application/json': {'schema': ItemModel}}
+                },
+                '404': {
+                    'description': 'Not found',
+                    'content': {'application/json': {'schema': ErrorModel}}
+                }
+            }
+        })
+        def get(self, item_id):
+            """
+            Returns an item.
+            """
+            return {}
+
+        resources.append(type('ItemResource{0}'.format(i), (Resource,), {'get': get}))
+    return resources
+
+
+def register(resources, lazy_spec):
+    app = Flask(__name__)
+    api = Api(app, lazy_spec=lazy_spec)
+    for i, resource in enumerate(resources):
+        api.add_resource(resource, '/items{0}/<int:item_id>'.format(i))
+    return app
+
+
+def bench(lazy_spec):
+    times = []
+    for _ in range(5):
+        resources = make_resources()
+        start = time.perf_counter()
+        register(resources, lazy_spec)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    eager_time = bench(False)
+    lazy_time = bench(True)
+
+    print('{0} resources, eager spec: {1:6.3f} s'.format(RESOURCES, eager_time))
+    print('{0} resources, lazy spec:  {1:6.3f} s'.format(RESOURCES, lazy_time))
+    print('speedup of registration:   {0:6.2f}x'.format(eager_time / lazy_time))
+
+    app = register(make_resources(), True)
+    start = time.perf_counter()
+    app.test_client().get('/api/swagger.json')
+    first_time = time.perf_counter() - start
+    print('first spec request, lazy:  {0:6.3f} s'.format(first_time))
+
+
+if __name__ == '__main__':
+    main()
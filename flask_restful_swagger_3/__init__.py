@@ -1,17 +1,43 @@
+import bisect
+import collections
+import collections.abc
+import dataclasses
+import datetime
+import enum
 import inspect
 import copy
 import json
-
-from flask import Blueprint, request
+import logging
+import os
+import random
+import threading
+import types
+import typing
+import weakref
+
+import click
+from flask import Blueprint, current_app, has_app_context, make_response, request
+from flask.cli import AppGroup
 from flask_restful import (Api as restful_Api, abort as flask_abort,
                            Resource as flask_Resource)
 
 from flask_restful_swagger_3.swagger import (ValidationError, create_swagger_endpoint,
+                                             create_swagger_file_endpoint, SpecViews, SPEC_FILE_SUFFIXES,
+                                             dedupe_schemas,
                                              add_parameters, validate_path_item_object,
                                              validate_operation_object,
                                              validate_components_object,
                                              extract_swagger_path, parse_method_doc,
-                                             parse_schema_doc, _auth as auth)
+                                             parse_schema_doc, compile_schema, get_column_types,
+                                             prepare_swagger_endpoint, get_swagger_path,
+                                             get_request_swagger_path,
+                                             _auth as auth)
+
+# Optional, provides typing.Literal before Python 3.8
+try:
+    import typing_extensions
+except ImportError:
+    typing_extensions = None
 
 
 def abort(http_status_code, schema=None, **kwargs):
@@ -24,11 +50,20 @@ class ModelError(Exception):
     pass
 
 
+class RecordsError(ValueError):
+    """Raised when constructing models from records fails. `errors` maps the index of each invalid record to
+    its error messages."""
+
+    def __init__(self, errors):
+        super(RecordsError, self).__init__('{0} invalid records'.format(len(errors)))
+        self.errors = errors
+
+
 def auth_required(f):
     """Decorator which checks if the request is permitted to call the view"""
 
     def decorator(*args, **kwargs):
-        if not auth(request.args.get('api_key'), extract_swagger_path(request.url_rule.rule), request.method):
+        if not auth(request.args.get('api_key'), get_request_swagger_path(), request.method):
             abort(401)
         return f(*args, **kwargs)
 
@@ -76,12 +111,38 @@ class Api(restful_Api):
         add_parameters(self._swagger_object, kwargs)
 
         api_spec_url = kwargs.pop('api_spec_url', '/api/swagger')
+        api_spec_cache_control = kwargs.pop('api_spec_cache_control', None)
+        api_spec_redirect = kwargs.pop('api_spec_redirect', False)
+        api_spec_file = kwargs.pop('api_spec_file', None)
+        lazy_spec = kwargs.pop('lazy_spec', False)
+        dedupe_schemas = kwargs.pop('dedupe_schemas', False)
         add_api_spec_resource = kwargs.pop('add_api_spec_resource', True)
         api_version = kwargs.pop('version', None)
         servers = kwargs.pop('servers', None)
 
+        self._swagger_endpoint = None
+        self._spec_views = None
+        self._api_spec_file = api_spec_file
+        self._frozen = False
+        # The validation error of the document if freezing it before the first request failed
+        self._freeze_error = None
+        # In lazy mode, the resources whose swagger documentation is not built yet. A document served from a file
+        # is only built if get_swagger_doc() is called
+        self._lazy_spec = lazy_spec or api_spec_file is not None
+        self._pending_resources = collections.deque()
+        self._spec_lock = threading.RLock()
+        self._dedupe_schemas = dedupe_schemas
+        # The (app, endpoint, resource) tuples of the url rules whose swagger path is not precomputed yet
+        self._unprepared_rules = []
+        self._rules_lock = threading.Lock()
+        # The paths of the swagger document in sorted order, kept sorted as resources are added
+        self._path_index = sorted(self._swagger_object.get('paths', {}))
+
         super(Api, self).__init__(*args, **kwargs)
 
+        # Encode the compact models as JSON objects
+        self.representations['application/json'] = output_json
+
         if self.app and not self._swagger_object['info']['title']:
             self._swagger_object['info']['title'] = self.app.name
 
@@ -92,16 +153,49 @@ class Api(restful_Api):
             self._swagger_object["servers"] = servers
 
         # Unless told otherwise, create and register the swagger endpoint
-        if add_api_spec_resource:
+        if add_api_spec_resource and api_spec_file:
+            self._swagger_endpoint = create_swagger_file_endpoint(api_spec_file, cache_control=api_spec_cache_control)
+            self.add_resource(self._swagger_endpoint, '{0}.json'.format(api_spec_url),
+                              '{0}.html'.format(api_spec_url), endpoint='swagger')
+        elif add_api_spec_resource:
             api_spec_urls = [
                 '{0}.json'.format(api_spec_url),
                 '{0}.html'.format(api_spec_url),
+                '{0}/tags/<tag>.json'.format(api_spec_url),
+                '{0}.<spec_hash>.json'.format(api_spec_url),
             ]
 
-            self.add_resource(create_swagger_endpoint(self.get_swagger_doc()),
-                              *api_spec_urls, endpoint='swagger')
+            self._swagger_endpoint = create_swagger_endpoint(self._swagger_object,
+                                                             cache_control=api_spec_cache_control,
+                                                             path_index=self._path_index,
+                                                             redirect_to_hash=api_spec_redirect,
+                                                             prepare=self._prepare_spec)
+            self.add_resource(self._swagger_endpoint, *api_spec_urls, endpoint='swagger')
 
     def add_resource(self, resource, *urls, **kwargs):
+        if self._frozen:
+            raise ValueError('Resources can not be added to the api after its swagger document is frozen')
+
+        # References in request bodies are resolved against the components of this document
+        components_schemas = self._swagger_object['components'].setdefault('schemas', {})
+        for method in [m.lower() for m in resource.methods]:
+            body_validator = getattr(resource.__dict__.get(method, None), '__dict__', {}).get(
+                '__swagger_body_validator', None)
+            if body_validator:
+                body_validator.bind(components_schemas, self._build_spec if self._lazy_spec else None)
+
+        if self._lazy_spec:
+            self._pending_resources.append((resource, urls))
+        else:
+            self._add_resource_spec(resource, urls)
+
+        if self._swagger_endpoint is not None:
+            self._swagger_endpoint.invalidate()
+
+        super(Api, self).add_resource(resource, *urls, **kwargs)
+
+    def _add_resource_spec(self, resource, urls):
+        """Adds the documentation of a resource to the swagger document."""
         path_item = {}
         # definitions = {}
         schemas = {}
@@ -122,10 +216,7 @@ class Api(restful_Api):
 
         validate_components_object(schemas)
 
-        if "schemas" in self._swagger_object['components']:
-            self._swagger_object['components']["schemas"].update(schemas)
-        else:
-            self._swagger_object['components']["schemas"] = schemas
+        self._swagger_object['components']["schemas"].update(schemas)
 
         if path_item:
             validate_path_item_object(path_item)
@@ -138,14 +229,207 @@ class Api(restful_Api):
                     if self.blueprint.url_prefix.endswith('/'):
                         raise ValidationError('url_prefix must not end with a /')
                     url = self.blueprint.url_prefix + url
-                self._swagger_object['paths'][extract_swagger_path(url)] = path_item
+                swagger_path = extract_swagger_path(url)
+                if swagger_path not in self._swagger_object['paths']:
+                    bisect.insort(self._path_index, swagger_path)
+                self._swagger_object['paths'][swagger_path] = path_item
+
+    def _prepare_spec(self):
+        """Completes the swagger document before it is frozen."""
+        self._build_spec()
+        if self._dedupe_schemas:
+            dedupe_schemas(self._swagger_object)
+
+    def _build_spec(self):
+        """Adds the documentation of the resources registered in lazy mode to the swagger document."""
+        if not self._pending_resources:
+            return
+        with self._spec_lock:
+            while self._pending_resources:
+                resource, urls = self._pending_resources[0]
+                self._add_resource_spec(resource, urls)
+                self._pending_resources.popleft()
+
+    def freeze(self):
+        """
+        Validates the swagger document, checks that its references resolve and builds the index used to serve
+        it. Resources can not be added afterwards. It is called automatically before the first request.
+        """
+        self._prepare_pending_rules()
+        if self._freeze_error is not None:
+            raise self._freeze_error
+        if self._frozen:
+            return
+        # The document served from a file is validated when it is exported
+        if self._api_spec_file is None:
+            self._get_spec_views().freeze()
+        self._frozen = True
+
+    def _get_spec_views(self):
+        views = getattr(self._swagger_endpoint, 'views', None)
+        if views is None:
+            if self._spec_views is None:
+                self._spec_views = SpecViews(self._swagger_object, path_index=self._path_index,
+                                             prepare=self._prepare_spec)
+            views = self._spec_views
+        return views
+
+    def get_rendered_spec(self):
+        """
+        Returns the whole swagger document serialized, freezing the api. It must be called within an
+        application context.
+        :return: A RenderedSpec
+        """
+        self.freeze()
+        views = self._get_spec_views()
+        return views.get(views.operations)
 
-        super(Api, self).add_resource(resource, *urls, **kwargs)
+    def get_spec_hash(self):
+        """
+        Returns the content hash of the swagger document, which is served at the immutable url
+        `{api_spec_url}.<hash>.json`. It must be called within an application context.
+        :return: The hash or None if the api does not serve its swagger document from memory
+        """
+        if getattr(self._swagger_endpoint, 'views', None) is None:
+            return None
+        return self.get_rendered_spec().hash
+
+    def _freeze_before_request(self):
+        self._prepare_pending_rules()
+        if not self._frozen:
+            if self._lazy_spec:
+                # The document is built and validated when it is first requested
+                self._frozen = True
+            else:
+                try:
+                    self.freeze()
+                except ValidationError as error:
+                    # Only fail the requests for the document: the spec endpoint raises the error again when it
+                    # validates the document, and the other endpoints are served
+                    self._freeze_error = error
+                    self._frozen = True
+                    logger.error('Invalid swagger document: %s', error)
+
+    def _init_app(self, app):
+        super(Api, self)._init_app(app)
+        app.before_request(self._freeze_before_request)
+        app.extensions.setdefault('flask-restful-swagger-3', []).append(self)
+        if 'swagger' not in app.cli.commands:
+            app.cli.add_command(swagger_cli)
+
+    def _register_view(self, app, resource, *urls, **kwargs):
+        endpoint = kwargs.get('endpoint', None) or resource.__name__.lower()
+
+        super(Api, self)._register_view(app, resource, *urls, **kwargs)
+
+        # Precompute the swagger path and operations of the new url rules before the first request. Looking
+        # rules up rebuilds the url map, so it is done once for all resources rather than for each of them.
+        # The rules of a blueprint are only added to the application when the blueprint is registered.
+        if isinstance(app, Blueprint):
+            app.record(lambda state: self._unprepared_rules.append(
+                (state.app, '{0}.{1}'.format(state.blueprint.name, endpoint), resource)))
+        else:
+            if self.blueprint:
+                endpoint = '{0}.{1}'.format(self.blueprint.name, endpoint)
+            self._unprepared_rules.append((app, endpoint, resource))
+
+    def _prepare_pending_rules(self):
+        if not self._unprepared_rules:
+            return
+        # Called before every request: take the pending rules under the lock, so concurrent first requests
+        # prepare each of them once
+        with self._rules_lock:
+            pending, self._unprepared_rules = self._unprepared_rules, []
+        for app, endpoint, resource in pending:
+            self._prepare_swagger_rules(app, endpoint, resource)
+
+    @staticmethod
+    def _prepare_swagger_rules(app, endpoint, resource):
+        prepare_swagger_endpoint(app, endpoint, resource)
+        try:
+            rules = list(app.url_map.iter_rules(endpoint))
+        except KeyError:
+            rules = []
+        for rule in rules:
+            get_swagger_path(rule.rule)
 
     def get_swagger_doc(self):
         """Returns the swagger document object."""
+        self._build_spec()
         return self._swagger_object
 
+    def get_path_item(self, path):
+        """
+        Returns the path item object of a path of the swagger document.
+        :param path: The swagger path, e.g. "/users/{user_id}"
+        :return: The path item object or None
+        """
+        return self.get_swagger_doc()['paths'].get(path, None)
+
+    def get_paths(self, prefix=''):
+        """
+        Returns the paths of the swagger document starting with a prefix, in sorted order.
+        :param prefix: The prefix of the paths, e.g. "/users"
+        :return: A list of (path, path item object) tuples
+        """
+        paths = self.get_swagger_doc()['paths']
+        start = bisect.bisect_left(self._path_index, prefix)
+        result = []
+        for path in self._path_index[start:]:
+            if not path.startswith(prefix):
+                break
+            result.append((path, paths[path]))
+        return result
+
+
+def export_swagger_doc(api, path):
+    """
+    Writes the swagger document of an api to a file, and its compressed variants next to it. It must be called
+    within an application context.
+    :param api: The Api instance
+    :param path: The path of the JSON file
+    """
+    rendered = api.get_rendered_spec()
+    with open(path, 'wb') as f:
+        f.write(rendered.body)
+    for encoding, suffix in SPEC_FILE_SUFFIXES.items():
+        with open(path + suffix, 'wb') as f:
+            f.write(rendered.variant(encoding))
+
+
+swagger_cli = AppGroup('swagger', help='Swagger specification commands.')
+
+
+@swagger_cli.command('export')
+@click.option('--output', '-o', default='swagger.json', show_default=True,
+              help='The file to write the document to. The blueprint name is appended when there are several Apis.')
+def export_command(output):
+    """Writes the swagger documents of the application to disk, with gzip and deflate compressed copies."""
+    apis = current_app.extensions.get('flask-restful-swagger-3', [])
+    if not apis:
+        raise click.ClickException('The application has no swagger Api')
+
+    for i, api in enumerate(apis):
+        path = output
+        if len(apis) > 1:
+            root, ext = os.path.splitext(output)
+            path = '{0}.{1}{2}'.format(root, api.blueprint.name if api.blueprint else i, ext)
+        export_swagger_doc(api, path)
+        click.echo('Exported {0}'.format(path))
+
+
+# The extracted definitions of the models by class, as (definition, nested model classes) tuples
+_extracted_models = weakref.WeakKeyDictionary()
+
+
+def _copy_definition(obj):
+    """Copies an extracted definition, a JSON-like structure whose only mutable values are dicts and lists."""
+    if isinstance(obj, dict):
+        return {k: _copy_definition(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_copy_definition(v) for v in obj]
+    return obj
+
 
 class Extractor(object):
     """
@@ -169,6 +453,20 @@ class Extractor(object):
     def _extract(self):
         raise NotImplementedError()
 
+    @staticmethod
+    def invalidate(model=None):
+        """
+        Drops the extracted definition of a model and of the models nesting it directly, whose references
+        contain its name, so they are extracted again. Called when a public attribute of a model is replaced.
+        :param model: The model, all models if omitted
+        """
+        if model is None:
+            _extracted_models.clear()
+            return
+        for cls, entry in list(_extracted_models.items()):
+            if cls is model or model in entry[1]:
+                _extracted_models.pop(cls, None)
+
 
 class _BaseExtractorImpl(Extractor):
     """
@@ -182,37 +480,66 @@ class _BaseExtractorImpl(Extractor):
         return self._extract_schemas(self._operation)
 
     def _extract_schemas(self, obj):
-        """Converts all schemes in a given object to its proper swagger representation."""
-        definitions = {}
-        if isinstance(obj, list):
-            for i, o in enumerate(obj):
-                obj[i], definitions_ = self._extract_schemas(o)
-                definitions.update(definitions_)
-
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                obj[k], definitions_ = self._extract_schemas(v)
-                definitions.update(definitions_)
-
-        if inspect.isclass(obj):
+        """
+        Converts all schemes in a given object to its proper swagger representation. The models are replaced by
+        references and their definitions, and the definitions of the models nested in them, are returned.
+        Each model is visited once, so recursive models are supported.
+        """
+        models = collections.deque()
+        obj = self._replace_models(obj, models)
 
-            obj, definitions = self._extract_model(obj, definitions)
+        definitions = {}
+        visited = set(models)
+        while models:
+            model = models.popleft()
+            definition, nested_models = self._extract_model(model)
+            # The extracted definition is shared, hand out a copy which the caller may modify
+            definitions[model.__name__] = _copy_definition(definition)
+            for nested_model in nested_models:
+                if nested_model not in visited:
+                    visited.add(nested_model)
+                    models.append(nested_model)
         return obj, definitions
 
-    def _extract_model(self, obj, definitions):
-        # Object is a model. Convert it to valid json and get a definition object
-        if not issubclass(obj, Schema):
-            raise ValueError('"{0}" is not a subclass of the schema model'.format(obj))
-        definition = obj.definitions()
-        description = parse_schema_doc(obj, definition)
-        if description:
-            definition['description'] = description
-        # The definition itself might contain models, so extract them again
-        definition, additional_definitions = self._extract_schemas(definition)
-        definitions[obj.__name__] = definition
-        definitions.update(additional_definitions)
-        obj = obj.reference()
-        return obj, definitions
+    def _extract_model(self, model):
+        """
+        Returns the definition of a model, whose models are replaced by references, and the models it nests.
+        Each model is extracted once; the definition is cached and must not be modified.
+        """
+        entry = _extracted_models.get(model, None)
+        if entry is None:
+            # Copy the definition, so replacing nested models does not modify the class attributes
+            definition = copy.deepcopy(model.definitions())
+            description = parse_schema_doc(model, definition)
+            if description:
+                definition['description'] = description
+            nested_models = []
+            definition = self._replace_models(definition, nested_models)
+            entry = (definition, tuple(nested_models))
+            _extracted_models[model] = entry
+        return entry
+
+    @staticmethod
+    def _replace_models(obj, models):
+        """
+        Replaces the models in an object by references, in place.
+        :param obj: The object
+        :param models: A list the replaced models are appended to
+        :return: The object, or a reference if the object is a model
+        """
+        stack = [[obj]]
+        while stack:
+            container = stack.pop()
+            for k, v in (enumerate(container) if isinstance(container, list) else container.items()):
+                if isinstance(v, (dict, list)):
+                    stack.append(v)
+                elif inspect.isclass(v):
+                    # Object is a model. Convert it to valid json
+                    if not isinstance(v, SchemaMeta):
+                        raise ValueError('"{0}" is not a subclass of the schema model'.format(v))
+                    models.append(v)
+                    container[k] = v.reference()
+        return obj if not inspect.isclass(obj) else obj.reference()
 
 
 class _RequestParserExtractorImpl(_BaseExtractorImpl):
@@ -344,32 +671,224 @@ class _RequestParserExtractorImpl(_BaseExtractorImpl):
         param['type'] = 'array'
 
 
-class Schema(dict):
+logger = logging.getLogger(__name__)
+
+# The fraction of the models constructed with `Schema.trusted` which are validated, unless the current flask app
+# sets its SWAGGER_TRUSTED_SAMPLE_RATE option
+trusted_sample_rate = 0
+
+
+def _get_trusted_sample_rate():
+    """Returns the sample rate of the trusted models of the current app, or the default outside of an app."""
+    if has_app_context():
+        return current_app.config.get('SWAGGER_TRUSTED_SAMPLE_RATE', trusted_sample_rate)
+    return trusted_sample_rate
+
+# Schema models by name, used to resolve references in model properties
+_models = weakref.WeakValueDictionary()
+
+
+def _register_model(name, model):
+    """
+    Registers a model under its name for the references to it.
+    Warns if the name is already used by a model defined elsewhere, as the references only resolve to the last one.
+    A model defined again at the same place, like the model of a reloaded module, replaces the previous one silently.
+    """
+    registered = _models.get(name, None)
+    if registered is not None and registered is not model and (
+            (registered.__module__, registered.__qualname__) != (model.__module__, model.__qualname__)):
+        logger.warning('The model "%s" of %s replaces the model "%s" of %s in the references to "%s"',
+                       model.__qualname__, model.__module__, registered.__qualname__, registered.__module__, name)
+    _models[name] = model
+
+
+def _resolve_model(ref):
+    """Returns the definition of the model referenced by a '$ref'. Unknown references are not validated."""
+    model = _models.get(ref.rsplit('/', 1)[-1], None)
+    if model is None:
+        logger.warning('The reference "%s" is not a model, its values are not validated', ref)
+        return {}
+    return model.definitions()
+
+
+class SchemaMeta(type):
+    """
+    Metaclass of the schema models.
+    Compiles the validators of a model when the class is defined and again whenever one of its public
+    attributes is replaced. A model defined with `compact=True`, or inheriting from a compact model, is derived
+    from `CompactSchema` instead of `dict` and gets a slot for each of its properties.
+    """
+
+    def __new__(mcs, name, bases, namespace, compact=False, **kwargs):
+        slots = next((base._compact_slots for base in bases if getattr(base, '_compact_slots', None) is not None),
+                     None)
+        if compact or slots is not None:
+            if 'properties' in namespace:
+                properties = namespace['properties']
+            else:
+                properties = next((base.properties for base in bases if getattr(base, 'properties', None)), None)
+            slots = dict(slots or {})
+            new_slots = []
+            for key in properties or ():
+                if key not in slots:
+                    slots[key] = '_s{0}'.format(len(slots))
+                    new_slots.append(slots[key])
+            namespace = dict(namespace, __slots__=tuple(new_slots), _compact_slots=slots)
+            bases = tuple(CompactSchema if base is Schema else base for base in bases)
+        return super(SchemaMeta, mcs).__new__(mcs, name, bases, namespace, **kwargs)
+
+    def __init__(cls, name, bases, namespace, compact=False, **kwargs):
+        super(SchemaMeta, cls).__init__(name, bases, namespace, **kwargs)
+        _register_model(name, cls)
+        cls._compile_validators()
+
+    def __setattr__(cls, name, value):
+        if name == 'properties' and cls._compact_slots is not None and not set(value or ()) <= set(cls._compact_slots):
+            raise ValueError('The properties of the compact model "{0}" can not be extended'.format(cls.__name__))
+        super(SchemaMeta, cls).__setattr__(name, value)
+        if name == '__name__':
+            _register_model(value, cls)
+            Extractor.invalidate(cls)
+        elif name == '__doc__':
+            Extractor.invalidate(cls)
+        elif not name.startswith('_'):
+            cls._compile_validators()
+            Extractor.invalidate(cls)
+
+
+# The validation and the class methods shared by the dict models and the compact models.
+# The base classes of the models have no docstring, as the docstring of a model is its description.
+class _SchemaBase(metaclass=SchemaMeta):
+    __slots__ = ()
     properties = None
+    # The slot of each property of a compact model, by property name
+    _compact_slots = None
 
     def __init__(self, **kwargs):
-        if self.properties:
+        validators = self._property_validators
+        if validators:
             for k, v in kwargs.items():
-                if k not in self.properties:
+                validator = validators.get(k, None)
+                if validator is None:
                     raise ValueError(
                             'The model "{0}" does not have an attribute "{1}"'.format(self.__class__.__name__, k))
-                if 'type' in self.properties[k]:
-                    type_ = self.properties[k]['type']
-                    if type_ == 'integer' and not isinstance(v, int):
-                        raise ValueError('The attribute "{0}" must be an int, but was "{1}"'.format(k, type(v)))
-                    if type_ == 'number' and not isinstance(v, int) and not isinstance(v, float):
-                        raise ValueError(
-                                'The attribute "{0}" must be an int or float, but was "{1}"'.format(k, type(v)))
-                    if type_ == 'string' and not isinstance(v, str):
-                        raise ValueError('The attribute "{0}" must be a string, but was "{1}"'.format(k, type(v)))
-                    if type_ == 'boolean' and not isinstance(v, bool):
-                        raise ValueError('The attribute "{0}" must be an int, but was "{1}"'.format(k, type(v)))
-                self[k] = v
-
-        if hasattr(self, 'required'):
-            for key in self.required:
-                if key not in kwargs:
-                    raise ValueError('The attribute "{0}" is required'.format(key))
+                errors = validator(v)
+                if errors:
+                    path, message = errors[0]
+                    raise ValueError('The attribute "{0}" {1}'.format(k + path, message))
+            self._store(kwargs)
+
+        for key in self._required_properties:
+            if key not in kwargs:
+                raise ValueError('The attribute "{0}" is required'.format(key))
+
+    @classmethod
+    def _compile_validators(cls):
+        """Compiles a validation function for each property of the model."""
+        if cls.properties:
+            cls._property_validators = {k: compile_schema(v, _resolve_model) for k, v in cls.properties.items()}
+            cls._property_columns = {k: get_column_types(v) for k, v in cls.properties.items()}
+        else:
+            cls._property_validators = None
+            cls._property_columns = None
+        cls._required_properties = tuple(getattr(cls, 'required', None) or ())
+
+    @classmethod
+    def validate_many(cls, records):
+        """
+        Validates a list of records at once, one property at a time.
+        Properties only checking "type" and "enum" are validated with set operations over all records, the
+        others with the compiled validator of the property.
+        :param records: A list of dicts or other mappings, like compact models
+        :return: A dict mapping the index of every invalid record to its error messages
+        """
+        errors = {}
+        rows = []
+        for i, record in enumerate(records):
+            if isinstance(record, collections.abc.Mapping):
+                rows.append((i, record))
+            else:
+                errors[i] = ['The record must be an object, but was "{0}"'.format(type(record).__name__)]
+
+        validators = cls._property_validators
+        if validators:
+            known = frozenset(validators)
+            for i, record in rows:
+                if not known.issuperset(record):
+                    errors.setdefault(i, []).extend(
+                        'The model "{0}" does not have an attribute "{1}"'.format(cls.__name__, k)
+                        for k in record if k not in known)
+
+            for name, validate in validators.items():
+                column = cls._property_columns[name]
+                if column is not None:
+                    types, choices = column
+                    values = [record[name] for i, record in rows if name in record]
+                    if set(map(type, values)) <= types:
+                        try:
+                            if choices is None or choices.issuperset(values):
+                                continue
+                        except TypeError:
+                            pass
+                for i, record in rows:
+                    if name in record:
+                        property_errors = validate(record[name])
+                        if property_errors:
+                            errors.setdefault(i, []).extend(
+                                'The attribute "{0}" {1}'.format(name + path, message)
+                                for path, message in property_errors)
+
+        for name in cls._required_properties:
+            for i, record in rows:
+                if name not in record:
+                    errors.setdefault(i, []).append('The attribute "{0}" is required'.format(name))
+
+        return dict(sorted(errors.items()))
+
+    @classmethod
+    def trusted(cls, **kwargs):
+        """
+        Constructs a model from values which are known to be valid, for example read from the database, without
+        validating them. Only the attribute names are checked. A fraction of the models constructed this way, set
+        by the SWAGGER_TRUSTED_SAMPLE_RATE option of the app or `trusted_sample_rate`, are validated, and their
+        errors logged instead of raised.
+        :return: The model
+        """
+        model = cls.__new__(cls)
+        validators = cls._property_validators
+        if validators:
+            if not validators.keys() >= kwargs.keys():
+                raise ValueError('The model "{0}" does not have an attribute "{1}"'.format(
+                    cls.__name__, next(k for k in kwargs if k not in validators)))
+            model._store(kwargs)
+        sample_rate = _get_trusted_sample_rate()
+        if sample_rate and random.random() < sample_rate:
+            errors = cls.validate_many([kwargs])
+            if errors:
+                logger.warning('Invalid trusted model "%s": %s', cls.__name__, '; '.join(errors[0]))
+        return model
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Validates a list of records with `validate_many` and constructs a model from each of them.
+        :param records: A list of dicts or other mappings, like compact models
+        :return: A list of models
+        :raises RecordsError: If any record is invalid
+        """
+        errors = cls.validate_many(records)
+        if errors:
+            raise RecordsError(errors)
+
+        models = []
+        if cls._property_validators:
+            for record in records:
+                model = cls.__new__(cls)
+                model._store(record)
+                models.append(model)
+        else:
+            models = [cls.__new__(cls) for _ in records]
+        return models
 
     @classmethod
     def reference(cls):
@@ -387,12 +906,413 @@ class Schema(dict):
     def is_required(cls):
         return bool(filter(lambda x: bool(x), map(lambda x: x['required'], cls.properties.values())))
 
+    @classmethod
+    def from_dataclass(cls, dataclass):
+        """
+        Returns a model whose properties are derived from the fields of a dataclass and their type hints.
+        Supported types are str, int, float, bool, datetime, date, Enum subclasses, Literal, Optional, Union,
+        List and Dict, and nested dataclasses, which become nested models. The model accepts the values of the
+        dataclass as well as their JSON values, and its fields read as attributes return the values of the
+        dataclass. The model is created once per dataclass.
+        :param dataclass: The dataclass
+        :return: A subclass of this model
+        """
+        if not dataclasses.is_dataclass(dataclass) or not inspect.isclass(dataclass):
+            raise ValueError('"{0}" is not a dataclass'.format(dataclass))
+        if cls._compact_slots is not None:
+            raise ValueError('Compact models can not be derived from dataclasses')
+
+        model = _dataclass_models.get(dataclass, None)
+        if model is not None:
+            return model
+
+        namespace = {'type': 'object', '__module__': dataclass.__module__, '_dataclass': dataclass}
+        # The docstring generated by the dataclass decorator is its signature, which is not a description
+        if dataclass.__doc__ and not dataclass.__doc__.startswith(dataclass.__name__ + '('):
+            namespace['__doc__'] = dataclass.__doc__
+        model = type(cls)(dataclass.__name__, (_DataclassModel, cls), namespace)
+        # Register the model before deriving its properties, so recursive dataclasses refer to it
+        _dataclass_models[dataclass] = model
+
+        try:
+            hints = typing.get_type_hints(dataclass)
+            model._field_types = {field.name: hints.get(field.name, typing.Any)
+                                  for field in dataclasses.fields(dataclass)}
+            properties = {}
+            required = []
+            for field in dataclasses.fields(dataclass):
+                schema, optional = _get_annotation_schema(hints.get(field.name, typing.Any), cls)
+                has_default = (field.default is not dataclasses.MISSING or
+                               field.default_factory is not dataclasses.MISSING)
+                if isinstance(field.default, (str, int, float, bool)) and not isinstance(field.default, enum.Enum):
+                    schema = dict(schema, default=field.default)
+                if not optional and not has_default:
+                    required.append(field.name)
+                properties[field.name] = schema
+        except Exception:
+            del _dataclass_models[dataclass]
+            raise
+
+        if required:
+            model.required = required
+        model.properties = properties
+        return model
+
+
+# A model is a dict of its validated properties, unless it is defined with `class Model(Schema, compact=True)`
+class Schema(_SchemaBase, dict):
+    _store = dict.update
+
+
+# Marks the unset slots of the compact models
+_unset = object()
+
+
+# Base class of the compact models. Their properties are stored in slots instead of the hash table of a dict.
+# The models are mappings of their properties, in the order of the `properties` of the model, and are encoded
+# as JSON objects by the representation of the `Api`.
+class CompactSchema(_SchemaBase):
+    __slots__ = ()
+    _compact_slots = {}
+
+    def _store(self, values):
+        slots = self._compact_slots
+        for k, v in values.items():
+            setattr(self, slots[k], v)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, self._compact_slots[key])
+        except (KeyError, AttributeError):
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        try:
+            slot = self._compact_slots[key]
+        except KeyError:
+            raise KeyError(key)
+        setattr(self, slot, value)
+
+    def __delitem__(self, key):
+        try:
+            delattr(self, self._compact_slots[key])
+        except (KeyError, AttributeError):
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        slot = self._compact_slots.get(key, None)
+        return slot is not None and hasattr(self, slot)
+
+    def __iter__(self):
+        for key, slot in self._compact_slots.items():
+            if getattr(self, slot, _unset) is not _unset:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if isinstance(other, collections.abc.Mapping):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return collections.abc.KeysView(self)
+
+    def values(self):
+        return collections.abc.ValuesView(self)
+
+    def items(self):
+        return collections.abc.ItemsView(self)
+
+    def to_dict(self):
+        """
+        Returns the properties of the model. Nested models are not converted.
+        :return: A dict
+        """
+        values = {}
+        for key, slot in self._compact_slots.items():
+            value = getattr(self, slot, _unset)
+            if value is not _unset:
+                values[key] = value
+        return values
+
+
+collections.abc.Mapping.register(CompactSchema)
+
+
+def is_model(obj):
+    """
+    Returns whether an object is a model or a model class, a dict model or a compact model. The compact models
+    are not dicts, so they are not instances of `Schema` even if they are declared with it.
+    :param obj: The object
+    :return: True if the object is a model or a model class
+    """
+    return isinstance(obj, (_SchemaBase, SchemaMeta))
+
 
-def get_swagger_blueprint(docs, api_spec_url='/api/swagger', **kwargs):
+def _encode_model(obj):
+    """The `default` function of the JSON representation, which encodes the compact models as objects."""
+    if isinstance(obj, CompactSchema):
+        return obj.to_dict()
+    raise TypeError('Object of type {0} is not JSON serializable'.format(type(obj).__name__))
+
+
+def output_json(data, code, headers=None):
+    """Makes a flask response with a JSON encoded body, like the representation of flask-restful, encoding the
+    compact models as objects."""
+    settings = dict(current_app.config.get('RESTFUL_JSON', {}))
+    # In debug mode, indent the JSON unless the indent is set
+    if current_app.debug:
+        settings.setdefault('indent', 4)
+    settings.setdefault('default', _encode_model)
+
+    # Always end the JSON with a new line
+    dumped = json.dumps(data, **settings) + '\n'
+
+    resp = make_response(dumped, code)
+    resp.headers.extend(headers or {})
+    return resp
+
+
+# The models created from dataclasses, by dataclass
+_dataclass_models = weakref.WeakKeyDictionary()
+
+
+# Base class of the models created from dataclasses, before the model class they are derived from
+class _DataclassModel(object):
+    __slots__ = ()
+    _dataclass = None
+    # The type hint of each field of the dataclass, by field name
+    _field_types = None
+
+    def __init__(self, **kwargs):
+        super(_DataclassModel, self).__init__(**{k: _to_json_value(v) for k, v in kwargs.items()})
+
+    def __getattr__(self, name):
+        """Reads the fields as attributes, converted to the types of the dataclass."""
+        try:
+            value = self[name]
+        except KeyError:
+            raise AttributeError('"{0}" object has no attribute "{1}"'.format(type(self).__name__, name))
+        return _from_json_value(value, self._field_types.get(name, typing.Any))
+
+    @classmethod
+    def from_instance(cls, instance):
+        """
+        Constructs a model from an instance of its dataclass.
+        :param instance: The dataclass instance
+        :return: The model
+        """
+        if not isinstance(instance, cls._dataclass):
+            raise ValueError('"{0}" is not an instance of "{1}"'.format(instance, cls._dataclass.__name__))
+        return cls(**{field.name: getattr(instance, field.name) for field in dataclasses.fields(instance)})
+
+    def to_instance(self):
+        """
+        Returns an instance of the dataclass of the model, with the values converted to the types of its fields.
+        :return: The dataclass instance
+        """
+        return _to_dataclass_instance(self._dataclass, self)
+
+
+def _to_json_value(value):
+    """Converts the values of a dataclass instance to JSON values: Enum members to their values, dates and times
+    to ISO 8601 strings and nested dataclass instances to dicts. Other values are returned as they are."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if dataclasses.is_dataclass(value) and not inspect.isclass(value):
+        return {field.name: _to_json_value(getattr(value, field.name)) for field in dataclasses.fields(value)}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_to_json_value(item) for item in value]
+    if type(value) is dict:
+        return {k: _to_json_value(v) for k, v in value.items()}
+    return value
+
+
+def _to_dataclass_instance(dataclass, values):
+    """Constructs a dataclass instance from the JSON values of its fields."""
+    model = _dataclass_models.get(dataclass, None)
+    hints = model._field_types if model is not None else typing.get_type_hints(dataclass)
+    return dataclass(**{field.name: _from_json_value(values[field.name], hints.get(field.name, typing.Any))
+                        for field in dataclasses.fields(dataclass) if field.init and field.name in values})
+
+
+def _from_json_value(value, annotation):
+    """
+    Converts a JSON value to the type of a dataclass field, the reverse of `_to_json_value`.
+    Values which already have the type, or whose type hint is not supported, are returned as they are.
+    :param value: The JSON value
+    :param annotation: The type hint of the field
+    :return: The converted value
+    """
+    if value is None:
+        return None
+    origin, args = _get_generic_type(annotation)
+
+    if origin is typing.Union:
+        types = [arg for arg in args if arg is not type(None)]
+        return _from_json_value(value, types[0]) if len(types) == 1 else value
+
+    if origin in (list, tuple, set, frozenset) and isinstance(value, (list, tuple, set, frozenset)):
+        if args and (args[-1] is Ellipsis or origin is not tuple):
+            items = [_from_json_value(item, args[0]) for item in value]
+        elif args:
+            items = [_from_json_value(item, arg) for item, arg in zip(value, args)]
+        else:
+            items = value
+        return origin(items)
+
+    if origin is dict and isinstance(value, collections.abc.Mapping):
+        return {k: _from_json_value(v, args[1]) if len(args) == 2 else v for k, v in value.items()}
+
+    if inspect.isclass(annotation) and not isinstance(value, annotation):
+        if dataclasses.is_dataclass(annotation) and isinstance(value, collections.abc.Mapping):
+            return _to_dataclass_instance(annotation, value)
+        if issubclass(annotation, enum.Enum):
+            return annotation(value)
+        if issubclass(annotation, datetime.datetime) and isinstance(value, str):
+            # datetime.fromisoformat does not accept the Z suffix before Python 3.11
+            return annotation.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value)
+        if issubclass(annotation, datetime.date) and isinstance(value, str):
+            return annotation.fromisoformat(value)
+    return value
+
+
+def _get_values_type(values):
+    """Returns the swagger type of a list of values if they all have the same one."""
+    types = set()
+    for value in values:
+        if isinstance(value, bool):
+            types.add('boolean')
+        elif isinstance(value, int):
+            types.add('integer')
+        elif isinstance(value, float):
+            types.add('number')
+        elif isinstance(value, str):
+            types.add('string')
+        else:
+            return None
+    return types.pop() if len(types) == 1 else None
+
+
+# The Literal special forms. typing.Literal requires Python 3.8, typing_extensions provides it before.
+_literal_forms = tuple(form for form in (getattr(typing, 'Literal', None), getattr(typing_extensions, 'Literal', None))
+                       if form is not None)
+
+
+# The type of the unions written `int | None`, which requires Python 3.10
+_union_type = getattr(types, 'UnionType', None)
+
+
+def _get_generic_type(annotation):
+    """
+    Returns the origin and the arguments of a type hint, like `typing.get_origin` and `typing.get_args` which
+    require Python 3.8. The origin of the unions written `int | None` is `typing.Union`.
+    :param annotation: The type hint
+    :return: A tuple (origin or None, arguments)
+    """
+    if _union_type is not None and isinstance(annotation, _union_type):
+        return typing.Union, annotation.__args__
+    origin = getattr(annotation, '__origin__', None)
+    if getattr(annotation, '_special', False):
+        # An unsubscripted generic, like typing.List on Python 3.7
+        return origin, ()
+    return origin, getattr(annotation, '__args__', ())
+
+
+def _get_annotation_schema(annotation, base):
+    """
+    Converts a type hint to a schema.
+    :param annotation: The type hint
+    :param base: The model class the models of nested dataclasses are derived from
+    :return: A tuple (schema, whether the value may be None)
+    """
+    origin, args = _get_generic_type(annotation)
+
+    if origin is typing.Union:
+        types = [arg for arg in args if arg is not type(None)]
+        optional = len(types) < len(args)
+        if len(types) == 1:
+            schema = _get_annotation_schema(types[0], base)[0]
+        else:
+            schema = {'anyOf': [_get_annotation_schema(arg, base)[0] for arg in types]}
+        if optional and isinstance(schema, SchemaMeta):
+            # A model is a class, so it is made nullable by wrapping it in a schema
+            schema = {'allOf': [schema], 'nullable': True}
+        elif optional:
+            schema = dict(schema, nullable=True)
+        return schema, optional
+
+    if origin is not None and origin in _literal_forms:
+        schema = {'enum': list(args)}
+        type_ = _get_values_type(args)
+        if type_:
+            schema['type'] = type_
+        return schema, False
+
+    if origin in (list, tuple, set, frozenset) or annotation in (list, tuple, set, frozenset):
+        schema = {'type': 'array'}
+        if args and args[-1] is not Ellipsis:
+            schema['items'] = _get_annotation_schema(args[0], base)[0]
+        if set in (origin, annotation) or frozenset in (origin, annotation):
+            schema['uniqueItems'] = True
+        return schema, False
+
+    if origin is dict or annotation is dict:
+        schema = {'type': 'object'}
+        if len(args) == 2:
+            schema['additionalProperties'] = _get_annotation_schema(args[1], base)[0]
+        return schema, False
+
+    if inspect.isclass(annotation):
+        if dataclasses.is_dataclass(annotation):
+            return base.from_dataclass(annotation), False
+        if issubclass(annotation, enum.Enum):
+            values = [member.value for member in annotation]
+            schema = {'enum': values}
+            type_ = _get_values_type(values)
+            if type_:
+                schema['type'] = type_
+            return schema, False
+        if isinstance(annotation, SchemaMeta):
+            return annotation, False
+        if issubclass(annotation, bool):
+            return {'type': 'boolean'}, False
+        if issubclass(annotation, int):
+            return {'type': 'integer'}, False
+        if issubclass(annotation, float):
+            return {'type': 'number'}, False
+        if issubclass(annotation, str):
+            return {'type': 'string'}, False
+        if issubclass(annotation, datetime.datetime):
+            return {'type': 'string', 'format': 'date-time'}, False
+        if issubclass(annotation, datetime.date):
+            return {'type': 'string', 'format': 'date'}, False
+
+    # Any other type is not checked
+    return {}, annotation is typing.Any
+
+
+def get_swagger_blueprint(docs, api_spec_url='/api/swagger', api_spec_cache_control=None, api_spec_redirect=False,
+                          **kwargs):
     """
     Returns a Flask blueprint to serve the given list of swagger document objects.
     :param docs: A list of of swagger document objects
     :param api_spec_url: The URL path that serves the swagger specification document
+    :param api_spec_cache_control: The value of the Cache-Control header of the specification document
+    :param api_spec_redirect: Redirect the specification document url to its content addressed url
     :return: A Flask blueprint
     """
     swagger_object = {}
@@ -422,9 +1342,12 @@ def get_swagger_blueprint(docs, api_spec_url='/api/swagger', **kwargs):
     api_spec_urls = [
         '{0}.json'.format(api_spec_url),
         '{0}.html'.format(api_spec_url),
+        '{0}/tags/<tag>.json'.format(api_spec_url),
+        '{0}.<spec_hash>.json'.format(api_spec_url),
     ]
 
-    api.add_resource(create_swagger_endpoint(swagger_object),
+    api.add_resource(create_swagger_endpoint(swagger_object, cache_control=api_spec_cache_control,
+                                             redirect_to_hash=api_spec_redirect),
                      *api_spec_urls, endpoint='swagger')
 
     return blueprint
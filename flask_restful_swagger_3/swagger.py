@@ -1,11 +1,21 @@
 import collections
+import collections.abc
 import re
 import inspect
 import copy
+import os
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+import zlib
 from functools import wraps
 
-from flask import request
-from flask_restful import Resource, reqparse, inputs
+from flask import current_app, request, redirect, url_for, send_file
+from flask_restful import Resource, reqparse, inputs, abort
+from werkzeug.exceptions import BadRequest
 
 
 class ValidationError(ValueError):
@@ -20,52 +30,739 @@ def auth(api_key, endpoint, method):
     return True
 
 
-def _auth(*args, **kwargs):
-    return auth(*args, **kwargs)
+class AuthCache(object):
+    """
+    Caches the decisions of the `auth` function by api key, endpoint and method.
 
+    The cache holds at most `maxsize` decisions, evicting the least recently used one, and each decision
+    expires `ttl` seconds after it was made. It is safe to use from several threads. Enable it by assigning
+    an instance to `auth_cache`:
 
-def create_swagger_endpoint(swagger_object):
-    """Creates a flask_restful api endpoint for the swagger spec"""
+        swagger.auth_cache = swagger.AuthCache(maxsize=10000, ttl=60)
+    """
 
-    class SwaggerEndpoint(Resource):
-        def get(self):
-            swagger_doc = {}
-            # filter keys with empty values
-            for k, v in swagger_object.items():
-                if v or k == 'paths':
-                    if k == 'paths':
-                        paths = {}
-                        for endpoint, view in v.items():
-                            views = {}
-                            for method, docs in view.items():
-                                # check permissions. If a user has not access to an api, do not show the docs of it
-                                if auth(request.args.get('api_key'), endpoint, method):
-                                    views[method] = docs
-                            if views:
-                                paths[endpoint] = views
-                        swagger_doc['paths'] = collections.OrderedDict(sorted(paths.items()))
-                    else:
-                        swagger_doc[k] = v
+    def __init__(self, maxsize=1024, ttl=60, timer=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._decisions = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._func = None
+        # Incremented on invalidation, so decisions made concurrently with it are not stored
+        self._generation = 0
+
+    def __len__(self):
+        return len(self._decisions)
+
+    def authorize(self, func, api_key, endpoint, method):
+        """
+        Returns the cached decision of `func` or calls it and caches its decision.
+        :param func: The auth function
+        :return: The decision
+        """
+        key = (api_key, endpoint, method)
+        now = self.timer()
+
+        with self._lock:
+            if func is not self._func:
+                # The auth function was replaced, the decisions of the previous one are not valid anymore
+                self._decisions.clear()
+                self._func = func
+                self._generation += 1
+            entry = self._decisions.get(key, None)
+            if entry is not None and entry[1] > now:
+                self._decisions.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation
+
+        # Call the auth function without holding the lock, it may be slow
+        decision = func(api_key, endpoint, method)
+
+        with self._lock:
+            if generation == self._generation:
+                self._decisions[key] = (decision, now + self.ttl)
+                self._decisions.move_to_end(key)
+                while len(self._decisions) > self.maxsize:
+                    self._decisions.popitem(last=False)
+
+        return decision
+
+    def invalidate(self, api_key=None, endpoint=None, method=None):
+        """
+        Removes the cached decisions matching the given api key, endpoint and method. Omitted arguments match
+        any value, so calling it without arguments removes all decisions.
+        """
+        with self._lock:
+            self._generation += 1
+            if api_key is None and endpoint is None and method is None:
+                self._decisions.clear()
+                return
+            for key in list(self._decisions):
+                if ((api_key is None or key[0] == api_key) and (endpoint is None or key[1] == endpoint) and
+                        (method is None or key[2] == method)):
+                    del self._decisions[key]
+
+
+# Set to an AuthCache to cache the decisions of the auth function
+auth_cache = None
+
+
+def _auth(api_key, endpoint, method):
+    if auth_cache is None:
+        return auth(api_key, endpoint, method)
+    return auth_cache.authorize(auth, api_key, endpoint, method)
+
+
+# Override this function in your application to authorize many operations at once.
+# It is called with an api key and a list of (endpoint, method) tuples and returns the set of allowed tuples.
+# If it is not set, `auth` is called for every operation.
+auth_many = None
+
+
+def _auth_many(api_key, operations):
+    if auth_many is not None:
+        return set(auth_many(api_key, operations))
+    return {operation for operation in operations if _auth(api_key, *operation)}
+
+
+# Returned by resolve_pointer for the pointers which do not resolve, as null is a valid JSON value
+_unresolved = object()
+
+
+def validate_swagger_object(swagger_object):
+    """
+    Validates the fields of a swagger document which are not validated when resources are added,
+    and checks that all local references of the document resolve.
+    :param swagger_object: The swagger document object
+    """
+    servers = swagger_object.get('servers', [])
+    if not isinstance(servers, list):
+        raise ValidationError('Invalid servers. must a list. See {url}'.format(
+            url='http://swagger.io/specification/#infoObject'))
+    for server in servers:
+        validate_server_object(server)
 
-                if k == 'servers':
-                    if isinstance(v, list):
-                        for server in v:
-                            validate_server_object(server)
-                            continue
-                    else:
-                        raise ValidationError('Invalid servers. must a list. See {url}'.format(
-                            field=k,
-                            url='http://swagger.io/specification/#infoObject'))
+    if 'info' in swagger_object:
+        validate_info_object(swagger_object['info'])
 
-                if k == 'info':
-                    validate_info_object(v)
-                    continue
+    for ref in _iter_refs(swagger_object):
+        if ref.startswith('#') and resolve_pointer(swagger_object, ref[1:], _unresolved) is _unresolved:
+            raise ValidationError('Unresolved reference "{0}"'.format(ref))
+
+
+def _iter_refs(obj):
+    """Yields the values of all "$ref" fields of a document."""
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            ref = obj.get('$ref', None)
+            if isinstance(ref, str):
+                yield ref
+            stack.extend(obj.values())
+        elif isinstance(obj, list):
+            stack.extend(obj)
+
+
+# The array indices of JSON pointers, without leading zeros (RFC 6901)
+_array_index_regex = re.compile(r'0|[1-9][0-9]*')
+
+
+def resolve_pointer(document, pointer, default=None):
+    """
+    Resolves a JSON pointer against a document.
+    :param document: The document
+    :param pointer: The JSON pointer, e.g. "/components/schemas/UserModel"
+    :param default: The value returned if the pointer does not resolve
+    :return: The value the pointer refers to, or `default` if it does not exist
+    """
+    if not pointer:
+        return document
+    if not pointer.startswith('/'):
+        return default
+    for token in pointer[1:].split('/'):
+        token = token.replace('~1', '/').replace('~0', '~')
+        if isinstance(document, dict) and token in document:
+            document = document[token]
+        elif (isinstance(document, list) and _array_index_regex.fullmatch(token) is not None and
+              int(token) < len(document)):
+            document = document[int(token)]
+        else:
+            return default
+    return document
+
+
+_SCHEMA_REF_PREFIX = '#/components/schemas/'
+
+
+def _get_schema_refs(obj):
+    """Returns the names of the component schemas referenced by an object."""
+    names = set()
+    for ref in _iter_refs(obj):
+        if ref.startswith(_SCHEMA_REF_PREFIX):
+            names.add(ref[len(_SCHEMA_REF_PREFIX):].split('/')[0].replace('~1', '/').replace('~0', '~'))
+    return frozenset(names)
+
+
+# The keywords of a schema object whose values are schemas, and lists or maps of schemas
+_SUBSCHEMA_KEYWORDS = ('items', 'additionalProperties', 'not')
+_SUBSCHEMA_LIST_KEYWORDS = ('allOf', 'anyOf', 'oneOf')
+_SUBSCHEMA_MAP_KEYWORDS = ('properties',)
+
+
+def _iter_subschemas(schema):
+    """Yields the (keyword, key, subschema) tuples of the schemas nested in a schema, key being None for single
+    schemas."""
+    for keyword in _SUBSCHEMA_KEYWORDS:
+        if isinstance(schema.get(keyword, None), dict):
+            yield keyword, None, schema[keyword]
+    for keyword in _SUBSCHEMA_LIST_KEYWORDS:
+        for i, subschema in enumerate(schema.get(keyword, None) or ()):
+            if isinstance(subschema, dict):
+                yield keyword, i, subschema
+    for keyword in _SUBSCHEMA_MAP_KEYWORDS:
+        for name, subschema in (schema.get(keyword, None) or {}).items():
+            if isinstance(subschema, dict):
+                yield keyword, name, subschema
+
+
+def _rewrite_schemas(obj, rewrite):
+    """
+    Applies a function to the schema objects of a document part, i.e. to the values of its "schema" fields.
+    The containers leading to a rewritten schema are copied, so the document part itself is not modified.
+    :return: The document part, or a modified copy of it
+    """
+    if isinstance(obj, dict):
+        items = obj.items()
+    elif isinstance(obj, list):
+        items = enumerate(obj)
+    else:
+        return obj
+
+    copied = None
+    for k, v in items:
+        new = rewrite(v) if k == 'schema' and isinstance(v, dict) else _rewrite_schemas(v, rewrite)
+        if new is not v:
+            if copied is None:
+                copied = dict(obj) if isinstance(obj, dict) else list(obj)
+            copied[k] = new
+    return obj if copied is None else copied
+
+
+def _replace_subschema(schema, keyword, key, value, original):
+    """Sets a subschema of a shallow copy of a schema, copying the list or map containing it if needed."""
+    if key is None:
+        schema[keyword] = value
+    else:
+        if schema[keyword] is original[keyword]:
+            schema[keyword] = copy.copy(original[keyword])
+        schema[keyword][key] = value
+
+
+def dedupe_schemas(swagger_object, min_length=64):
+    """
+    Moves the inline schemas repeated in the paths of a swagger document to its components/schemas and replaces
+    them by references. Schemas are compared structurally and the largest repeated ones are moved first. The
+    objects of the document are not modified: the path items containing changes are replaced by copies. This
+    shrinks the serialized document, but not the memory used while the operation objects of the resources are
+    alive, as the copies are held in addition to them.
+    :param swagger_object: The swagger document object
+    :param min_length: The minimum length of the JSON serialization of the schemas to move
+    :return: The names of the new component schemas
+    """
+    # Equal schemas get the same signature, computed from their fields and the signatures of their subschemas
+    signatures = {}
+    # By signature, the approximate length of the serialized schema, the signatures of its subschemas, the
+    # number of occurrences and whether it is a reference
+    lengths, children, counts, references = [], [], [], []
+    # The signature of each schema object by id, keeping the objects alive so ids are not reused
+    by_id = {}
+
+    def sign(schema):
+        if id(schema) in by_id:
+            signature = by_id[id(schema)][0]
+        else:
+            shallow = dict(schema)
+            nested = collections.Counter()
+            length = 0
+            for keyword, key, subschema in _iter_subschemas(schema):
+                child = sign(subschema)
+                nested[child] += 1
+                length += lengths[child]
+                _replace_subschema(shallow, keyword, key, {'$signature': child}, schema)
+            canonical = json.dumps(shallow, sort_keys=True, default=repr)
+            signature = signatures.get(canonical, None)
+            if signature is None:
+                signature = signatures[canonical] = len(lengths)
+                lengths.append(length + len(canonical))
+                children.append(nested)
+                counts.append(0)
+                references.append('$ref' in schema)
+            by_id[id(schema)] = (signature, schema)
+        counts[signature] += 1
+        return signature
+
+    def count(schema):
+        sign(schema)
+        return schema
+
+    paths = swagger_object.get('paths', {})
+    for path_item in paths.values():
+        _rewrite_schemas(path_item, count)
+
+    # The number of occurrences of the signatures nested in a schema, at any depth
+    descendants = {}
+
+    def get_descendants(signature):
+        if signature not in descendants:
+            total = collections.Counter()
+            for child, n in children[signature].items():
+                total[child] += n
+                for descendant, m in get_descendants(child).items():
+                    total[descendant] += n * m
+            descendants[signature] = total
+        return descendants[signature]
+
+    components = swagger_object.setdefault('components', {})
+    names = set(components.get('schemas', None) or ())
+    hoisted = {}
+    canonicals = {signature: canonical for canonical, signature in signatures.items()}
+    for signature in sorted(range(len(lengths)), key=lambda signature: -lengths[signature]):
+        if counts[signature] < 2 or lengths[signature] < min_length or references[signature]:
+            continue
+        # The copies replaced by a reference do not contain their subschemas anymore
+        for descendant, n in get_descendants(signature).items():
+            counts[descendant] -= (counts[signature] - 1) * n
+        name = 'InlineSchema{0}'.format(hashlib.sha1(canonicals[signature].encode('utf-8')).hexdigest()[:8])
+        while name in names:
+            name += '_'
+        names.add(name)
+        hoisted[signature] = name
+
+    new_schemas = collections.OrderedDict()
+
+    def rewrite(schema):
+        rewritten = schema
+        for keyword, key, subschema in list(_iter_subschemas(schema)):
+            new = rewrite(subschema)
+            if new is not subschema:
+                if rewritten is schema:
+                    rewritten = dict(schema)
+                _replace_subschema(rewritten, keyword, key, new, schema)
+        name = hoisted.get(by_id[id(schema)][0], None)
+        if name is None:
+            return rewritten
+        new_schemas.setdefault(name, rewritten)
+        return {'$ref': _SCHEMA_REF_PREFIX + name}
+
+    if hoisted:
+        for path, path_item in list(paths.items()):
+            paths[path] = _rewrite_schemas(path_item, rewrite)
+        # Update the schemas in place, request body validators resolve references against them
+        components.setdefault('schemas', {}).update(new_schemas)
+    return list(new_schemas)
+
+
+def render_swagger_object(swagger_object, allowed, paths=None, schemas=None, tags=None):
+    """
+    Builds the swagger document shown to a user.
+    :param swagger_object: The swagger document object
+    :param allowed: The set of (endpoint, method) tuples of the operations the user has access to
+    :param paths: The paths of the document in sorted order, sorted here if omitted
+    :param schemas: The names of the component schemas to keep, all are kept if omitted
+    :param tags: The names of the tag objects to keep, all are kept if omitted
+    :return: The swagger document without empty fields and with the paths sorted
+    """
+    if paths is None:
+        paths = sorted(swagger_object.get('paths', {}))
+
+    swagger_doc = {}
+    # filter keys with empty values
+    for k, v in swagger_object.items():
+        if k == 'paths':
+            swagger_doc['paths'] = collections.OrderedDict()
+            for endpoint in paths:
+                views = {}
+                for method, docs in v[endpoint].items():
+                    if (endpoint, method) in allowed:
+                        views[method] = docs
+                if views:
+                    swagger_doc['paths'][endpoint] = views
+        elif k == 'components' and schemas is not None and 'schemas' in v:
+            components = dict(v)
+            components['schemas'] = collections.OrderedDict(
+                (name, schema) for name, schema in v['schemas'].items() if name in schemas)
+            components = {name: component for name, component in components.items() if component}
+            if components:
+                swagger_doc[k] = components
+        elif k == 'tags' and tags is not None:
+            swagger_doc[k] = [tag for tag in v if tag.get('name', None) in tags]
+        elif v:
+            swagger_doc[k] = v
+
+    return swagger_doc
+
+
+def _gzip_compress(body):
+    """Compresses with gzip, with a fixed modification time so the same body always gives the same bytes."""
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=9, mtime=0) as f:
+        f.write(body)
+    return buffer.getvalue()
+
+
+# Functions compressing the spec document by content coding, in order of preference
+SPEC_ENCODINGS = collections.OrderedDict([
+    ('gzip', _gzip_compress),
+    ('deflate', lambda body: zlib.compress(body, 9)),
+])
+
+# The suffixes of the files of the compressed spec documents by content coding
+SPEC_FILE_SUFFIXES = {
+    'gzip': '.gz',
+    'deflate': '.deflate',
+}
+
+
+class RenderedSpec(object):
+    """
+    A swagger document serialized to JSON once, with the strong ETag of its content.
+    The compressed variants of the document are built on the first request asking for them, and the
+    `max_fragments` most recently requested fragments are kept serialized.
+    """
+    max_fragments = 128
+
+    def __init__(self, swagger_doc):
+        self.document = swagger_doc
+        self._fragments = collections.OrderedDict()
+        settings = dict(current_app.config.get('RESTFUL_JSON', {}))
+        if current_app.debug:
+            settings.setdefault('indent', 4)
+
+        self.body = (json.dumps(swagger_doc, **settings) + '\n').encode('utf-8')
+        self.etag = hashlib.sha1(self.body).hexdigest()
+        # The content hash used in the immutable url of the document
+        self.hash = self.etag[:16]
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def variant(self, encoding):
+        """
+        Returns the document compressed with the given content coding.
+        :param encoding: A key of SPEC_ENCODINGS
+        """
+        body = self._variants.get(encoding, None)
+        if body is None:
+            with self._lock:
+                body = self._variants.get(encoding, None)
+                if body is None:
+                    body = SPEC_ENCODINGS[encoding](self.body)
+                    self._variants[encoding] = body
+        return body
+
+    def fragment(self, pointer):
+        """
+        Returns a part of the document, serialized once.
+        :param pointer: The JSON pointer of the part, e.g. "/components/schemas/UserModel"
+        :return: A RenderedSpec or None if the pointer does not resolve
+        """
+        with self._lock:
+            rendered = self._fragments.get(pointer, None)
+            if rendered is not None:
+                self._fragments.move_to_end(pointer)
+                return rendered
+
+        value = resolve_pointer(self.document, pointer, _unresolved)
+        if value is _unresolved:
+            return None
+        rendered = RenderedSpec(value)
+        with self._lock:
+            self._fragments[pointer] = rendered
+            while len(self._fragments) > self.max_fragments:
+                self._fragments.popitem(last=False)
+        return rendered
+
+    def make_response(self, cache_control=None):
+        """
+        Returns a response with the serialized document, or a 304 response if the request already has it.
+        The document is compressed with the best content coding accepted by the client.
+        :param cache_control: The value of the Cache-Control header
+        """
+        encoding = request.accept_encodings.best_match(list(SPEC_ENCODINGS))
+        if encoding is None:
+            response = current_app.response_class(self.body, mimetype='application/json')
+            response.set_etag(self.etag)
+        else:
+            response = current_app.response_class(self.variant(encoding), mimetype='application/json')
+            response.headers['Content-Encoding'] = encoding
+            response.set_etag('{0}-{1}'.format(self.etag, encoding))
+        response.vary.add('Accept-Encoding')
+        if cache_control:
+            response.headers['Cache-Control'] = cache_control
+        return response.make_conditional(request)
+
+
+class SpecViews(object):
+    """
+    Caches the rendered views of a swagger document by the set of operations visible to the user.
 
-            return swagger_doc
+    The set is keyed by a bitset over the index of the operations, so the users sharing the same permissions
+    share one rendered document. Views can be scoped to a set of tags, in which case they only contain the
+    component schemas referenced by their operations. The cache holds at most `maxsize` views, evicting the least
+    recently used one.
+    """
+
+    def __init__(self, swagger_object, maxsize=64, path_index=None, prepare=None):
+        self.swagger_object = swagger_object
+        self.maxsize = maxsize
+        self.path_index = path_index
+        self.prepare = prepare
+        self._views = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._index = None
+        self._operations = ()
+        self._paths = ()
+        # The bitset of the operations of each tag
+        self._tags = {}
+        self._tag_names = frozenset()
+        # The component schemas referenced directly by each operation and by each component schema
+        self._operation_schemas = {}
+        self._schema_graph = {}
+        # The component schemas referenced by the other components, which are kept in every view
+        self._component_schemas = frozenset()
+        # Incremented on invalidation, so views rendered concurrently with it are not stored
+        self._generation = 0
+
+    def __len__(self):
+        return len(self._views)
+
+    @property
+    def operations(self):
+        """The (endpoint, method) tuples of all operations of the document, in index order."""
+        self._get_index()
+        return self._operations
+
+    def _get_index(self):
+        index = self._index
+        if index is None:
+            index = self.freeze()
+        return index
+
+    def freeze(self):
+        """
+        Validates the document and builds the index of its operations. The document must not be modified
+        afterwards without calling `invalidate`.
+        :return: The index of the operations
+        """
+        if self.prepare is not None:
+            self.prepare()
+        validate_swagger_object(self.swagger_object)
+        paths = self.swagger_object.get('paths', {})
+        if self.path_index is not None and len(self.path_index) == len(paths):
+            self._paths = tuple(self.path_index)
+        else:
+            # The paths were modified without updating the index
+            self._paths = tuple(sorted(paths))
+        index = collections.OrderedDict()
+        tags = collections.defaultdict(int)
+        operation_schemas = {}
+        for endpoint in self._paths:
+            for method, operation in paths[endpoint].items():
+                bit = index[(endpoint, method)] = 1 << len(index)
+                operation_schemas[(endpoint, method)] = _get_schema_refs(operation)
+                for tag in (operation.get('tags', None) or ()) if isinstance(operation, dict) else ():
+                    tags[tag] |= bit
+
+        components = self.swagger_object.get('components', {})
+        self._schema_graph = {name: _get_schema_refs(schema)
+                              for name, schema in components.get('schemas', {}).items()}
+        self._component_schemas = _get_schema_refs({name: component for name, component in components.items()
+                                                    if name != 'schemas'})
+        self._operation_schemas = operation_schemas
+        self._tags = dict(tags)
+        # The tags of the operations and the declared tag objects, the only tags views can be scoped to
+        self._tag_names = frozenset(tags).union(tag.get('name', None) for tag in self.swagger_object.get('tags', [])
+                                                if isinstance(tag, dict))
+        self._operations = tuple(index)
+        self._index = index
+        return index
+
+    def _get_schema_closure(self, operations):
+        """Returns the names of the component schemas referenced transitively by the given operations."""
+        names = set(self._component_schemas)
+        for operation in operations:
+            names.update(self._operation_schemas[operation])
+        stack = list(names)
+        while stack:
+            for name in self._schema_graph.get(stack.pop(), ()):
+                if name not in names:
+                    names.add(name)
+                    stack.append(name)
+        return names
+
+    def get(self, allowed, tags=None):
+        """
+        Returns the rendered view of the document showing the given operations.
+        :param allowed: The (endpoint, method) tuples of the operations visible to the user
+        :param tags: The tags to scope the view to, all operations are shown if omitted
+        :return: A RenderedSpec
+        """
+        index = self._get_index()
+        bits = 0
+        for operation in allowed:
+            bits |= index.get(operation, 0)
+        if tags is not None:
+            # Unknown tags are dropped, so they do not make views with the same content distinct
+            tags = self._tag_names.intersection(tags)
+            mask = 0
+            for tag in tags:
+                mask |= self._tags.get(tag, 0)
+            bits &= mask
+        key = (bits, tags)
+
+        with self._lock:
+            rendered = self._views.get(key, None)
+            if rendered is not None:
+                self._views.move_to_end(key)
+                return rendered
+            generation = self._generation
+
+        operations = {operation for operation, bit in index.items() if bits & bit}
+        if tags is None:
+            rendered = RenderedSpec(render_swagger_object(self.swagger_object, operations, self._paths))
+        else:
+            rendered = RenderedSpec(render_swagger_object(self.swagger_object, operations, self._paths,
+                                                          schemas=self._get_schema_closure(operations), tags=tags))
+
+        with self._lock:
+            if generation == self._generation:
+                self._views[key] = rendered
+                while len(self._views) > self.maxsize:
+                    self._views.popitem(last=False)
+
+        return rendered
+
+    def invalidate(self):
+        """Drops the rendered views. Must be called when the swagger document is modified."""
+        with self._lock:
+            self._generation += 1
+            self._views.clear()
+            self._index = None
+
+
+# The Cache-Control header of the documents served at their content addressed url
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def create_swagger_endpoint(swagger_object, cache_control=None, max_views=64, path_index=None,
+                            redirect_to_hash=False, prepare=None):
+    """
+    Creates a flask_restful api endpoint for the swagger spec.
+    The document is serialized once for each set of operations visible to users and answered with an ETag.
+    The endpoint serves the operations of some tags only when it is given a `tag` url argument, or a comma
+    separated list of tags in the `tags` query argument. A part of the document is served when it is given a JSON
+    pointer in the `pointer` query argument.
+    Given a `spec_hash` url argument, the endpoint serves the document with a Cache-Control header making it
+    immutable if the hash matches the content of the document, or redirects to the url of its current content.
+    :param swagger_object: The swagger document object
+    :param cache_control: The value of the Cache-Control header of the responses
+    :param max_views: The maximum number of distinct views of the document kept serialized
+    :param path_index: The paths of the document in sorted order, sorted when the document is frozen if omitted
+    :param redirect_to_hash: Redirect the requests without `spec_hash` to the content addressed url
+    :param prepare: A function completing the swagger object, called before it is first served
+    """
+
+    class SwaggerEndpoint(Resource):
+        views = SpecViews(swagger_object, maxsize=max_views, path_index=path_index, prepare=prepare)
+
+        @classmethod
+        def invalidate(cls):
+            """Drops the serialized documents. Must be called when the swagger object is modified."""
+            cls.views.invalidate()
+
+        def get(self, tag=None, spec_hash=None):
+            tags = None
+            if tag is not None:
+                tags = [tag]
+            elif request.args.get('tags'):
+                tags = [name.strip() for name in request.args['tags'].split(',') if name.strip()]
+
+            # check permissions. If a user has not access to an api, do not show the docs of it
+            allowed = _auth_many(request.args.get('api_key'), self.views.operations)
+            rendered = self.views.get(allowed, tags)
+
+            if spec_hash is not None and spec_hash != rendered.hash:
+                return self.redirect_to_hash(rendered)
+            if spec_hash is None and redirect_to_hash and tag is None:
+                return self.redirect_to_hash(rendered)
+
+            pointer = request.args.get('pointer', None)
+            if pointer is not None:
+                rendered = rendered.fragment(pointer[1:] if pointer.startswith('#') else pointer)
+                if rendered is None:
+                    abort(404, message='Pointer "{0}" does not resolve'.format(pointer))
+
+            return rendered.make_response(IMMUTABLE_CACHE_CONTROL if spec_hash is not None else cache_control)
+
+        @staticmethod
+        def redirect_to_hash(rendered):
+            """
+            Redirects to the content addressed url of a rendered document, keeping the query arguments. The query
+            arguments named like the url arguments are dropped, they would be taken for them.
+            """
+            args = {k: v for k, v in request.args.items() if k not in ('spec_hash', 'tag')}
+            response = redirect(url_for(request.endpoint, spec_hash=rendered.hash, **args))
+            response.headers['Cache-Control'] = cache_control or 'no-cache'
+            return response
 
     return SwaggerEndpoint
 
 
+def create_swagger_file_endpoint(path, cache_control=None):
+    """
+    Creates a flask_restful api endpoint serving a swagger spec exported to a file, e.g. by `flask swagger export`.
+    The compressed files next to it are served to the clients accepting their content coding. The document is
+    served as is, so it is not filtered by the permissions of the user.
+    :param path: The path of the JSON file
+    :param cache_control: The value of the Cache-Control header of the responses
+    """
+    path = os.path.abspath(path)
+
+    class SwaggerFileEndpoint(Resource):
+        views = None
+        # The content codings of the existing compressed files, looked up on the first request
+        encodings = None
+
+        @classmethod
+        def invalidate(cls):
+            """The document is read from the file, there is nothing to drop."""
+
+        def get(self):
+            encodings = self.encodings
+            if encodings is None:
+                encodings = [encoding for encoding in SPEC_ENCODINGS
+                             if os.path.isfile(path + SPEC_FILE_SUFFIXES[encoding])]
+                SwaggerFileEndpoint.encodings = encodings
+
+            encoding = request.accept_encodings.best_match(encodings)
+            if encoding is None:
+                response = send_file(path, mimetype='application/json', conditional=True)
+            else:
+                response = send_file(path + SPEC_FILE_SUFFIXES[encoding], mimetype='application/json',
+                                     conditional=True)
+                response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            if cache_control:
+                response.headers['Cache-Control'] = cache_control
+            return response
+
+    return SwaggerFileEndpoint
+
+
 def set_nested(d, key_spec, value):
     """
     Sets a value in a nested dictionary.
@@ -122,13 +819,30 @@ def add_parameters(swagger_object, parameters):
             set_nested(swagger_object, field[2], value)
 
 
+# Maps the "in" field of swagger parameters to the flask request attribute holding their values
+PARAMETER_LOCATIONS = {
+    'query': 'args',
+    'header': 'headers',
+    'cookie': 'cookies',
+    'path': 'view_args'
+}
+
+# Human readable names of the parameter locations, used in error messages
+_friendly_locations = {
+    'args': 'the query string',
+    'headers': 'the HTTP headers',
+    'cookies': 'the request\'s cookies',
+    'view_args': 'the path'
+}
+
+
 def get_data_type(param):
     """
     Maps swagger data types to Python types.
     :param param: swagger parameter
     :return: Python type
     """
-    if 'schema' not in param:
+    if 'schema' not in param or not isinstance(param['schema'], dict):
         return None
     param = param['schema']
     param_type = param.get('type', None)
@@ -165,7 +879,7 @@ def get_data_type(param):
 
 def get_data_action(param):
     if 'schema' in param:
-        param_type = param['schema'].get('type', None)
+        param_type = param['schema'].get('type', None) if isinstance(param['schema'], dict) else None
 
         if param_type == 'array':
             return 'append'
@@ -180,12 +894,17 @@ def get_parser_arg(param):
     :param param: Swagger document parameter
     :return: Request parser argument
     """
+    schema = param.get('schema', None)
+    data_type = get_data_type(param)
+    if data_type is None and not (isinstance(schema, dict) and 'type' in schema):
+        # Like reqparse by default, keep the values of parameters without a schema type as strings
+        data_type = str
     return (
         param['name'],
         {
             'dest': param['name'],
-            'type': get_data_type(param),
-            'location': 'args',
+            'type': data_type,
+            'location': PARAMETER_LOCATIONS[param['in']],
             'help': param.get('description', None),
             'required': param.get('required', False),
             'default': param.get('default', None),
@@ -199,14 +918,49 @@ def get_parser_args(params):
     :param params: Swagger document parameters
     :return: Request parser arguments
     """
-    return [get_parser_arg(p) for p in params if p['in'] == 'query']
+    return [get_parser_arg(p) for p in params if p['in'] in PARAMETER_LOCATIONS]
+
+
+class SharedRequestParser(reqparse.RequestParser):
+    """
+    The reqparse parser passed as `_parser` to the documented methods. A new one is passed to every request, but its
+    arguments are built once and shared by all requests. They are copied the first time a request adds, removes or
+    replaces an argument, so the change only applies to the parser of that request.
+    """
+
+    @classmethod
+    def from_args(cls, args):
+        """
+        Returns a parser sharing arguments.
+        :param args: A tuple of `reqparse.Argument`
+        :return: The parser
+        """
+        parser = cls()
+        parser.args = args
+        return parser
+
+    def _copy_shared_args(self):
+        if isinstance(self.args, tuple):
+            self.args = list(copy.deepcopy(self.args))
+
+    def add_argument(self, *args, **kwargs):
+        self._copy_shared_args()
+        return super(SharedRequestParser, self).add_argument(*args, **kwargs)
+
+    def remove_argument(self, name):
+        self._copy_shared_args()
+        return super(SharedRequestParser, self).remove_argument(name)
+
+    def replace_argument(self, name, *args, **kwargs):
+        self._copy_shared_args()
+        return super(SharedRequestParser, self).replace_argument(name, *args, **kwargs)
 
 
 def get_parser(params):
     """
-    Returns a parser for query parameters from swagger document parameters.
+    Returns a parser for query, header, cookie and path parameters from swagger document parameters.
     :param params: swagger doc parameters
-    :return: Query parameter parser
+    :return: Request parameter parser
     """
     parser = reqparse.RequestParser()
 
@@ -216,28 +970,619 @@ def get_parser(params):
     return parser
 
 
-def doc(operation_object):
+def get_data_converter(param):
+    """
+    Maps a swagger parameter to a function converting a single raw request value.
+    :param param: swagger parameter
+    :return: Converter function or None if the raw value is used as is
+    """
+    if 'schema' not in param or not isinstance(param['schema'], dict):
+        return None
+    param = param['schema']
+    if param.get('type', None) == 'array':
+        param = param.get('items', {})
+    param_type = param.get('type', None)
+
+    if param_type == 'string':
+        param_format = param.get('format', None)
+        if param_format == 'date':
+            return inputs.date
+        elif param_format == 'date-time':
+            return inputs.datetime_from_iso8601
+    elif param_type == 'integer':
+        return int
+    elif param_type == 'number':
+        return float
+    elif param_type == 'boolean':
+        return inputs.boolean
+
+    return None
+
+
+def get_data_choices(param):
+    """
+    Returns the allowed values of a swagger parameter.
+    :param param: swagger parameter
+    :return: A frozenset of allowed values or None if any value is allowed
+    """
+    if 'schema' not in param or not isinstance(param['schema'], dict):
+        return None
+    param = param['schema']
+    if param.get('type', None) == 'array':
+        param = param.get('items', {})
+    if 'enum' in param:
+        return frozenset(param['enum'])
+    return None
+
+
+def get_fast_parser_arg(param):
+    """
+    Return a compiled argument for the fast parser.
+    :param param: Swagger document parameter
+    :return: A tuple of name, converter, multiple, required, default, choices and help
+    """
+    return (
+        param['name'],
+        get_data_converter(param),
+        get_data_action(param) == 'append',
+        param.get('required', False),
+        param.get('default', None),
+        get_data_choices(param),
+        param.get('description', None)
+    )
+
+
+class FastParser(object):
+    """
+    Parses request parameters with converters compiled once from swagger document parameters.
+
+    It replaces the reqparse parser passed as `_parser`: `parse_args` accepts the same arguments, returns a
+    `reqparse.Namespace` and aborts on invalid or missing values, or on unknown arguments if `strict` is set,
+    bundling the errors if `bundle_errors` or the BUNDLE_ERRORS option of the app is set. It reads the request
+    arguments, headers, cookies and view arguments directly instead of going through `reqparse.Argument`.
+    """
+
+    def __init__(self, params, bundle_errors=False):
+        # Group the compiled arguments by request attribute, so every source is looked up only once
+        args = collections.OrderedDict()
+        for p in params:
+            if p['in'] in PARAMETER_LOCATIONS:
+                args.setdefault(PARAMETER_LOCATIONS[p['in']], []).append(get_fast_parser_arg(p))
+        self.args = list(args.items())
+        self.names = frozenset(arg[0] for _, args_ in self.args for arg in args_)
+        self.bundle_errors = bundle_errors
+
+    def parse_args(self, req=None, strict=False, http_error_code=400):
+        """
+        Parses the parameters of a request.
+        :param req: The request, the current request if omitted
+        :param strict: Abort with 400 if the request has arguments which are not parameters
+        :param http_error_code: The status code of the response to invalid parameters
+        :return: A `reqparse.Namespace`
+        """
+        if req is None:
+            req = request
+
+        namespace = reqparse.Namespace()
+        errors = {} if self.bundle_errors or current_app.config.get('BUNDLE_ERRORS', False) else None
+
+        for location, args in self.args:
+            source = getattr(req, location, None) or {}
+            self._parse_source(source, location, args, namespace, errors, http_error_code)
+
+        if errors:
+            abort(http_error_code, message=errors)
+
+        if strict:
+            # Like reqparse, check the arguments of the query string, the form and the JSON body. The body is only
+            # read if it is JSON, as flask rejects reading other bodies as JSON.
+            names = list(req.values)
+            if req.is_json:
+                body = req.get_json(silent=True)
+                if isinstance(body, dict):
+                    names.extend(body)
+            unknown = [name for name in names if name not in self.names]
+            if unknown:
+                raise BadRequest('Unknown arguments: {0}'.format(', '.join(unknown)))
+
+        return namespace
+
+    def _parse_source(self, source, location, args, namespace, errors, http_error_code):
+        for name, converter, multiple, required, default, choices, help_ in args:
+            if name in source:
+                try:
+                    if multiple:
+                        if hasattr(source, 'getlist'):
+                            value = source.getlist(name)
+                        else:
+                            value = source[name]
+                            if not isinstance(value, list):
+                                value = [value]
+                        if converter is not None:
+                            value = [converter(v) for v in value]
+                        if choices is not None:
+                            for v in value:
+                                if v not in choices:
+                                    raise ValueError('{0} is not a valid choice'.format(v))
+                    else:
+                        value = source[name]
+                        if converter is not None:
+                            value = converter(value)
+                        if choices is not None and value not in choices:
+                            raise ValueError('{0} is not a valid choice'.format(value))
+                except Exception as error:
+                    self._handle_error(name, help_, error, errors, http_error_code)
+                    continue
+            elif required:
+                self._handle_error(name, help_, ValueError(
+                    'Missing required parameter in {0}'.format(_friendly_locations[location])), errors,
+                    http_error_code)
+                continue
+            else:
+                value = default
+
+            namespace[name] = value
+
+    @staticmethod
+    def _handle_error(name, help_, error, errors, http_error_code):
+        """Aborts the request with the error of a parameter, or adds it to `errors` if they are bundled."""
+        error_msg = help_.format(error_msg=str(error)) if help_ else str(error)
+        if errors is None:
+            abort(http_error_code, message={name: error_msg})
+        errors[name] = error_msg
+
+
+_email_regex = re.compile(
+    r"(^[-!#$%&'*+/=?^_`{}|~0-9A-Z]+(\.[-!#$%&'*+/=?^_`{}|~0-9A-Z]+)*"  # dot-atom
+    r'|^"([\001-\010\013\014\016-\037!#-\[\]-\177]|\\[\001-011\013\014\016-\177])*"'  # quoted-string
+    r')@(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?$', re.IGNORECASE)  # domain
+
+# Regular expressions of the string formats checked by compiled schemas
+_format_regexes = {
+    'date': re.compile(r'^\d{4}-\d{2}-\d{2}$'),
+    'date-time': re.compile(r'^\d{4}-\d{2}-\d{2}[Tt ]\d{2}:\d{2}:\d{2}(?:\.\d+)?(?:[Zz]|[+-]\d{2}:?\d{2})?$'),
+    'email': _email_regex
+}
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# Python classes of the data types of compiled schemas. Booleans are not accepted as integers or numbers.
+# Objects are dicts or other mappings, like the compact models; only dicts are checked as columns by their type.
+_type_classes = {
+    'integer': int,
+    'number': (int, float),
+    'string': str,
+    'boolean': bool,
+    'array': list,
+    'object': (dict, collections.abc.Mapping)
+}
+
+
+def _escape_pointer(token):
+    return '/' + str(token).replace('~', '~0').replace('/', '~1')
+
+
+def _prefix_errors(errors, pointer, child_errors):
+    """Adds the errors of a child value to a list of errors and returns it."""
+    if errors is None:
+        errors = []
+    errors.extend((pointer + path, message) for path, message in child_errors)
+    return errors
+
+
+def _compile_lazy(load, resolve):
+    """Compiles the schema returned by `load` on first use. Allows recursive and forward references."""
+    compiled = []
+
+    def validate(value):
+        if not compiled:
+            compiled.append(compile_schema(load(), resolve))
+        return compiled[0](value)
+
+    return validate
+
+
+def _compile_enum(enum):
+    try:
+        choices = frozenset(enum)
+    except TypeError:
+        choices = list(enum)
+
+    def check(value):
+        try:
+            if value in choices:
+                return None
+        except TypeError:
+            pass
+        return [('', 'must be one of {0}, but was {1!r}'.format(list(enum), value))]
+
+    return check
+
+
+def _compile_format(format_):
+    regex = _format_regexes[format_]
+
+    def check(value):
+        if isinstance(value, str) and regex.match(value) is None:
+            return [('', 'must be a valid "{0}", but was {1!r}'.format(format_, value))]
+        return None
+
+    return check
+
+
+def _compile_minimum(minimum, exclusive):
+    def check(value):
+        if _is_number(value) and (value <= minimum if exclusive else value < minimum):
+            return [('', 'must be greater than {0}{1}'.format('' if exclusive else 'or equal to ', minimum))]
+        return None
+
+    return check
+
+
+def _compile_maximum(maximum, exclusive):
+    def check(value):
+        if _is_number(value) and (value >= maximum if exclusive else value > maximum):
+            return [('', 'must be less than {0}{1}'.format('' if exclusive else 'or equal to ', maximum))]
+        return None
+
+    return check
+
+
+def _compile_length(min_length, max_length):
+    def check(value):
+        if isinstance(value, str):
+            if min_length is not None and len(value) < min_length:
+                return [('', 'must be at least {0} characters long'.format(min_length))]
+            if max_length is not None and len(value) > max_length:
+                return [('', 'must be at most {0} characters long'.format(max_length))]
+        return None
+
+    return check
+
+
+def _compile_pattern(pattern):
+    regex = re.compile(pattern)
+
+    def check(value):
+        if isinstance(value, str) and regex.search(value) is None:
+            return [('', 'must match the pattern "{0}"'.format(pattern))]
+        return None
+
+    return check
+
+
+def _compile_items(items, min_items, max_items, unique_items, resolve):
+    validate_item = compile_schema(items, resolve) if items is not None else None
+
+    def check(value):
+        if not isinstance(value, list):
+            return None
+        errors = None
+        if min_items is not None and len(value) < min_items:
+            errors = [('', 'must contain at least {0} items'.format(min_items))]
+        if max_items is not None and len(value) > max_items:
+            errors = [('', 'must contain at most {0} items'.format(max_items))]
+        if unique_items:
+            try:
+                unique = len(set(value)) == len(value)
+            except TypeError:
+                unique = all(item not in value[:i] for i, item in enumerate(value))
+            if not unique:
+                errors = (errors or []) + [('', 'must contain unique items')]
+        if validate_item is not None:
+            for i, item in enumerate(value):
+                item_errors = validate_item(item)
+                if item_errors:
+                    errors = _prefix_errors(errors, '/' + str(i), item_errors)
+        return errors
+
+    return check
+
+
+def _compile_properties(properties, required, additional_properties, resolve):
+    compiled = [(name, _escape_pointer(name), compile_schema(schema, resolve))
+                for name, schema in properties.items()]
+    required = [(name, _escape_pointer(name)) for name in required]
+    known = frozenset(properties)
+    if isinstance(additional_properties, dict) or inspect.isclass(additional_properties):
+        validate_additional = compile_schema(additional_properties, resolve)
+    else:
+        validate_additional = None
+
+    def check(value):
+        if not isinstance(value, collections.abc.Mapping):
+            return None
+        errors = None
+        for name, pointer, validate in compiled:
+            if name in value:
+                property_errors = validate(value[name])
+                if property_errors:
+                    errors = _prefix_errors(errors, pointer, property_errors)
+        for name, pointer in required:
+            if name not in value:
+                errors = _prefix_errors(errors, pointer, [('', 'is required')])
+        if additional_properties is False or validate_additional is not None:
+            for name in value:
+                if name in known:
+                    continue
+                if validate_additional is None:
+                    errors = _prefix_errors(errors, _escape_pointer(name), [('', 'is not allowed')])
+                else:
+                    property_errors = validate_additional(value[name])
+                    if property_errors:
+                        errors = _prefix_errors(errors, _escape_pointer(name), property_errors)
+        return errors
+
+    return check
+
+
+def _compile_composition(keyword, schemas, resolve):
+    validators = [compile_schema(schema, resolve) for schema in schemas]
+
+    def check(value):
+        if keyword == 'allOf':
+            errors = None
+            for validate in validators:
+                schema_errors = validate(value)
+                if schema_errors:
+                    errors = _prefix_errors(errors, '', schema_errors)
+            return errors
+        matches = sum(1 for validate in validators if not validate(value))
+        if keyword == 'anyOf' and not matches:
+            return [('', 'must match at least one schema in anyOf')]
+        if keyword == 'oneOf' and matches != 1:
+            return [('', 'must match exactly one schema in oneOf')]
+        return None
+
+    return check
+
+
+def get_column_types(schema):
+    """
+    Returns the exact Python types and the allowed values of a schema that only checks "type" and "enum".
+    It allows to validate many values at once with set operations.
+    :param schema: The schema object
+    :return: A tuple of a frozenset of types and a frozenset of allowed values or None, or None if the schema
+             has other checks
+    """
+    if not isinstance(schema, dict) or schema.get('type', None) not in _type_classes:
+        return None
+    for k in schema:
+        if k in ('$ref', 'minimum', 'maximum', 'minLength', 'maxLength', 'pattern', 'items', 'minItems', 'maxItems',
+                 'uniqueItems', 'properties', 'required', 'additionalProperties', 'allOf', 'anyOf', 'oneOf'):
+            return None
+    if schema.get('format', None) in _format_regexes:
+        return None
+
+    type_class = _type_classes[schema['type']]
+    types = set(type_class) if isinstance(type_class, tuple) else {type_class}
+    if schema.get('nullable', False):
+        types.add(type(None))
+
+    choices = None
+    if 'enum' in schema:
+        try:
+            choices = frozenset(schema['enum'])
+        except TypeError:
+            return None
+
+    return frozenset(types), choices
+
+
+def compile_schema(schema, resolve=None):
+    """
+    Compiles a schema object into a validation function.
+    The function returns None if the value is valid, otherwise a list of (path, message) tuples, where path
+    is a JSON pointer to the invalid value.
+    :param schema: The schema object or schema model class
+    :param resolve: A function returning the schema object referenced by a '$ref'
+    :return: Validation function
+    """
+    if inspect.isclass(schema):
+        return _compile_lazy(schema.definitions, resolve)
+
+    if '$ref' in schema:
+        ref = schema['$ref']
+
+        def load():
+            if resolve is None:
+                raise ValidationError('Unresolvable reference "{0}"'.format(ref))
+            return resolve(ref)
+
+        return _compile_lazy(load, resolve)
+
+    type_ = schema.get('type', None)
+    type_class = _type_classes.get(type_, object)
+    exclude_bool = type_ in ('integer', 'number')
+    nullable = schema.get('nullable', False)
+
+    checks = []
+    if 'enum' in schema:
+        checks.append(_compile_enum(schema['enum']))
+    if schema.get('format', None) in _format_regexes:
+        checks.append(_compile_format(schema['format']))
+    if 'minimum' in schema:
+        checks.append(_compile_minimum(schema['minimum'], schema.get('exclusiveMinimum', False)))
+    if 'maximum' in schema:
+        checks.append(_compile_maximum(schema['maximum'], schema.get('exclusiveMaximum', False)))
+    if 'minLength' in schema or 'maxLength' in schema:
+        checks.append(_compile_length(schema.get('minLength', None), schema.get('maxLength', None)))
+    if 'pattern' in schema:
+        checks.append(_compile_pattern(schema['pattern']))
+    if 'items' in schema or 'minItems' in schema or 'maxItems' in schema or schema.get('uniqueItems', False):
+        checks.append(_compile_items(schema.get('items', None), schema.get('minItems', None),
+                                     schema.get('maxItems', None), schema.get('uniqueItems', False), resolve))
+    required = schema.get('required', None)
+    if not isinstance(required, list):
+        required = []
+    if 'properties' in schema or required or 'additionalProperties' in schema:
+        checks.append(_compile_properties(schema.get('properties', None) or {}, required,
+                                          schema.get('additionalProperties', True), resolve))
+    for keyword in ('allOf', 'anyOf', 'oneOf'):
+        if keyword in schema:
+            checks.append(_compile_composition(keyword, schema[keyword], resolve))
+
+    def type_error(value):
+        return [('', 'must be of type "{0}", but was "{1}"'.format(type_, type(value).__name__))]
+
+    if nullable or len(checks) > 1:
+        def validate(value):
+            if not isinstance(value, type_class) or (exclude_bool and isinstance(value, bool)):
+                if value is None and nullable:
+                    return None
+                return type_error(value)
+            if value is None and nullable:
+                return None
+            errors = None
+            for check in checks:
+                check_errors = check(value)
+                if check_errors:
+                    errors = _prefix_errors(errors, '', check_errors)
+            return errors
+
+    # Specialized functions for the most common schemas: a type with at most one other keyword
+    elif checks:
+        check = checks[0]
+
+        def validate(value):
+            if isinstance(value, type_class) and not (exclude_bool and (value is True or value is False)):
+                return check(value)
+            return type_error(value)
+
+    elif exclude_bool:
+        def validate(value):
+            if isinstance(value, type_class) and value is not True and value is not False:
+                return None
+            return type_error(value)
+
+    else:
+        def validate(value):
+            if isinstance(value, type_class):
+                return None
+            return type_error(value)
+
+    return validate
+
+
+class RequestBodyValidator(object):
+    """
+    Validates JSON request bodies against the JSON schema of a request body object. Requests whose body has
+    another media type are not validated.
+
+    The schema is compiled once. References into components/schemas are resolved against the schemas
+    bound with `bind`, which is done by `Api.add_resource` when the resource is registered.
+    """
+
+    def __init__(self, request_body):
+        self.required = request_body.get('required', False)
+        self.schemas = {}
+        self.prepare = None
+
+        schema = None
+        for media_type, media_type_object in request_body.get('content', {}).items():
+            if media_type == 'application/json' or media_type.endswith('+json'):
+                schema = media_type_object.get('schema', None)
+                break
+
+        self._validate = compile_schema(schema, self.resolve) if schema is not None else None
+
+    def bind(self, schemas, prepare=None):
+        """
+        Binds the schemas used to resolve references.
+        :param schemas: The components/schemas object of the swagger document
+        :param prepare: A function completing the schemas, called when a reference does not resolve
+        """
+        self.schemas = schemas
+        self.prepare = prepare
+
+    def resolve(self, ref):
+        prefix = '#/components/schemas/'
+        if ref.startswith(prefix) and ref[len(prefix):] not in self.schemas and self.prepare is not None:
+            self.prepare()
+        if ref.startswith(prefix) and ref[len(prefix):] in self.schemas:
+            return self.schemas[ref[len(prefix):]]
+        raise ValidationError('Unresolvable reference "{0}"'.format(ref))
+
+    def validate(self, req=None):
+        """
+        Validates the body of a request. Aborts with 400 if it is invalid.
+        :param req: The request, defaults to the current request
+        """
+        if self._validate is None:
+            return
+        if req is None:
+            req = request
+
+        if not req.is_json:
+            # Other media types, e.g. forms, are not validated, and their body is not read so that flask can
+            # still parse it
+            has_body = req.content_length or req.headers.get('Transfer-Encoding', None)
+            if has_body or not self.required:
+                return
+            errors = [('', 'is required')]
+        else:
+            data = req.get_json(silent=True)
+            if data is not None:
+                errors = self._validate(data)
+            elif req.get_data(cache=True):
+                errors = [('', 'must be a valid JSON document')]
+            elif self.required:
+                errors = [('', 'is required')]
+            else:
+                return
+
+        if errors:
+            abort(400, message='Invalid request body',
+                  errors=[{'path': path or '/', 'message': message} for path, message in errors])
+
+
+def doc(operation_object, fast_parser=False, validate_body=False):
     """Decorator to save the documentation of an api endpoint.
 
     Saves the passed arguments as an attribute to use them later when generating the swagger spec.
+    If `fast_parser` is set, `_parser` is a `FastParser` instead of a reqparse parser.
+    If `validate_body` is set, the JSON body is validated against the `requestBody` schema before the
+    endpoint is called.
     """
     def decorated(f):
         f.__swagger_operation_object = copy.deepcopy(operation_object)
 
-        @wraps(f)
-        def inner(self, *args, **kwargs):
-            # Get names of resource function arguments
+        # Get names of resource function arguments once, at decoration time
+        func_args = inspect.getfullargspec(f).args
 
-            func_args = inspect.getfullargspec(f).args
-            # You can also use
-            # func_args = list(inspect.signature(f).parameters.keys())
+        # Build the parser for query arguments once if the special argument '_parser' is present.
+        # A FastParser can not be modified, so it is shared by all requests and threads. The arguments of the
+        # reqparse parser are shared, but every request gets a parser which copies them before modifying them.
+        if 'parameters' in f.__swagger_operation_object and '_parser' in func_args:
+            if fast_parser:
+                parser = FastParser(f.__swagger_operation_object['parameters'])
+            else:
+                parser = tuple(get_parser(f.__swagger_operation_object['parameters']).args)
+        else:
+            parser = None
+
+        if validate_body and 'requestBody' in f.__swagger_operation_object:
+            body_validator = RequestBodyValidator(f.__swagger_operation_object['requestBody'])
+        else:
+            body_validator = None
 
-            # Add a parser for query arguments if the special argument '_parser' is present
-            if 'parameters' in f.__swagger_operation_object and '_parser' in func_args:
-                kwargs.update({'_parser': get_parser(f.__swagger_operation_object['parameters'])})
+        if parser is None and body_validator is None:
+            return f
 
+        @wraps(f)
+        def inner(self, *args, **kwargs):
+            if body_validator is not None:
+                body_validator.validate()
+            if isinstance(parser, FastParser):
+                kwargs['_parser'] = parser
+            elif parser is not None:
+                kwargs['_parser'] = SharedRequestParser.from_args(parser)
             return f(self, *args, **kwargs)
 
+        inner.__swagger_body_validator = body_validator
         return inner
     return decorated
 
@@ -553,12 +1898,7 @@ def validate_url(url):
 
 
 def validate_email(email):
-    email_regex = re.compile(
-        r"(^[-!#$%&'*+/=?^_`{}|~0-9A-Z]+(\.[-!#$%&'*+/=?^_`{}|~0-9A-Z]+)*"  # dot-atom
-        r'|^"([\001-\010\013\014\016-\037!#-\[\]-\177]|\\[\001-011\013\014\016-\177])*"'  # quoted-string
-        r')@(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,6}\.?$', re.IGNORECASE)  # domain
-
-    return re.match(email_regex, email) is not None
+    return re.match(_email_regex, email) is not None
 
 
 def validate_server_variables_object(server_variables_object):
@@ -592,6 +1932,9 @@ def validate_example_object(example_object):
     pass
 
 
+_path_parameter_regex = re.compile('<(?:[^:]+:)?([^>]+)>')
+
+
 def extract_swagger_path(path):
     """
     Extracts a swagger type path from the given flask style path.
@@ -599,7 +1942,66 @@ def extract_swagger_path(path):
     And this /<string(length=2):lang_code>/<string:id>/<float:probability>
     to this: /{lang_code}/{id}/{probability}
     """
-    return re.sub('<(?:[^:]+:)?([^>]+)>', '{\\1}', path)
+    return _path_parameter_regex.sub('{\\1}', path)
+
+
+# The swagger paths of the url rules, by flask rule
+_swagger_paths = {}
+
+# The key of the operation objects of the endpoints in the extensions of an application
+_OPERATIONS_EXTENSION = 'flask-restful-swagger-3-operations'
+
+
+def get_swagger_path(rule):
+    """
+    Returns the swagger path of a flask url rule, which is only extracted once per rule.
+    :param rule: The flask rule, e.g. "/users/<int:user_id>"
+    :return: The swagger path, e.g. "/users/{user_id}"
+    """
+    path = _swagger_paths.get(rule, None)
+    if path is None:
+        path = _swagger_paths[rule] = extract_swagger_path(rule)
+    return path
+
+
+def prepare_swagger_endpoint(app, endpoint, resource):
+    """
+    Stores the operation objects of the resource of an endpoint in the application, so they are not looked up
+    again for every request.
+    :param app: The flask application
+    :param endpoint: The endpoint of the resource
+    :param resource: The resource class of the endpoint or None
+    :return: The operation objects of the endpoint by HTTP method
+    """
+    operations = {}
+    for method in getattr(resource, 'methods', None) or ():
+        f = getattr(resource, method.lower(), None)
+        operation = getattr(f, '__dict__', {}).get('__swagger_operation_object', None)
+        if operation:
+            operations[method] = operation
+    if 'HEAD' not in operations and 'GET' in operations:
+        operations['HEAD'] = operations['GET']
+
+    app.extensions.setdefault(_OPERATIONS_EXTENSION, {})[endpoint] = operations
+    return operations
+
+
+def get_request_swagger_path():
+    """Returns the swagger path of the url rule matched by the current request or None if no rule matched."""
+    rule = request.url_rule
+    return get_swagger_path(rule.rule) if rule is not None else None
+
+
+def get_request_operation():
+    """Returns the operation object documenting the current request or None if it is not documented."""
+    rule = request.url_rule
+    if rule is None:
+        return None
+    operations = current_app.extensions.get(_OPERATIONS_EXTENSION, {}).get(rule.endpoint, None)
+    if operations is None:
+        view = current_app.view_functions.get(rule.endpoint, None)
+        operations = prepare_swagger_endpoint(current_app, rule.endpoint, getattr(view, 'view_class', None))
+    return operations.get(request.method, None)
 
 
 def sanitize_doc(comment):
@@ -656,8 +2058,8 @@ def parse_schema_doc(cls, definition):
     if 'description' not in definition:
         full_doc = inspect.getdoc(cls)
 
-        # Avoid returning the docstring of the base dict class
-        if full_doc and full_doc != inspect.getdoc(dict):
+        # Avoid returning the docstring of the base dict class, or of object for the compact models
+        if full_doc and full_doc not in (inspect.getdoc(dict), inspect.getdoc(object)):
             lines = full_doc.split('\n')
             if lines:
                 # Use the first line of the class docstring as the description
@@ -1,7 +1,7 @@
 import pytest
 from flask import Flask
 from flask_restful_swagger_3 import Api
-from tests.resources import UserResource, EntityAddResource, ParseResource
+from tests.resources import UserResource, UserCreateResource, EntityAddResource, ParseResource
 
 
 @pytest.fixture(scope="module")
@@ -10,6 +10,7 @@ def test_app():
     api = Api(flask_app)
     api.add_resource(ParseResource, '/parse')
     api.add_resource(UserResource, '/users/<int:user_id>')
+    api.add_resource(UserCreateResource, '/users')
     app = flask_app.test_client()
     context = flask_app.test_request_context()
     yield {"app": app, "api": api, "context": context}
@@ -23,3 +24,19 @@ def test_parser():
     app = flask_app.test_client()
     context = flask_app.test_request_context()
     yield {"app": app, "api": api, "context": context}
+
+
+@pytest.fixture
+def new_app():
+    """
+    Returns a function creating an app with a new api, for the tests which change the api or its app.
+    The function takes a list of (resource, url, ...) tuples, ParseResource at /parse by default, and the api
+    arguments.
+    """
+    def make_app(resources=((ParseResource, '/parse'),), **kwargs):
+        flask_app = Flask(__name__)
+        api = Api(flask_app, **kwargs)
+        for resource, *urls in resources:
+            api.add_resource(resource, *urls)
+        return {"app": flask_app.test_client(), "api": api, "flask_app": flask_app}
+    return make_app
@@ -1,3 +1,8 @@
+import dataclasses
+import datetime
+import enum
+import typing
+
 from flask_restful_swagger_3 import Schema
 
 
@@ -40,4 +45,80 @@ class SchemaTestModel(Schema):
             'type': 'string'
         }
     }
-    required = ['id']
\ No newline at end of file
+    required = ['id']
+
+class EmailModel(Schema):
+    type = 'string'
+    format = 'email'
+
+
+class KeysModel(Schema):
+    type = 'object'
+    properties = {
+        'name': {
+            'type': 'string',
+            'maxLength': 8
+        }
+    }
+    required = ['name']
+
+
+class AccountModel(Schema):
+    """
+    Test schema model with nested models and constraints.
+    """
+    type = 'object'
+    properties = {
+        'id': {
+            'type': 'integer',
+            'minimum': 1
+        },
+        'role': {
+            'type': 'string',
+            'enum': ['admin', 'user']
+        },
+        'mail': EmailModel,
+        'keys': KeysModel.array()
+    }
+
+
+class Role(enum.Enum):
+    admin = 'admin'
+    user = 'user'
+
+
+@dataclasses.dataclass
+class Address:
+    """
+    Test dataclass nested in another one.
+    """
+    city: str
+    zip: typing.Optional[str] = None
+
+
+@dataclasses.dataclass
+class Member:
+    id: int
+    role: Role
+    joined: datetime.date
+    address: Address
+    billing_address: typing.Optional[Address] = None
+    tags: typing.List[str] = dataclasses.field(default_factory=list)
+    friends: typing.List['Member'] = dataclasses.field(default_factory=list)
+
+
+class CompactUserModel(Schema, compact=True):
+    """
+    Test compact model.
+    """
+    type = 'object'
+    properties = {
+        'id': {
+            'type': 'integer'
+        },
+        'name': {
+            'type': 'string'
+        },
+        'mail': EmailModel
+    }
+    required = ['id']
@@ -1,6 +1,7 @@
+from flask import request
 from flask_restful.reqparse import RequestParser
 from flask_restful_swagger_3 import Resource, swagger
-from tests.models import UserModel
+from tests.models import UserModel, AccountModel, CompactUserModel
 
 
 class ParseResource(Resource):
@@ -174,3 +175,60 @@ class EntityAddResource(Resource):
 
         name = args.get('name', 'somebody')
         return UserModel(**{'id': id, 'name': name}), 200
+
+
+class UserCreateResource(Resource):
+    @swagger.doc({
+        'tags': ['user'],
+        'description': 'Creates a user',
+        'requestBody': {
+            'required': True,
+            'content': {
+                'application/json': {
+                    'schema': UserModel
+                }
+            }
+        },
+        'responses': {
+            '201': {
+                'description': 'Created user',
+                'content': {
+                    'application/json': {
+                        'schema': UserModel
+                    }
+                }
+            }
+        }
+    }, validate_body=True)
+    def post(self):
+        """
+        Creates a user.
+        """
+        return UserModel(**request.get_json()), 201
+
+
+class AccountResource(Resource):
+    @swagger.doc({
+        'tags': ['account'],
+        'responses': {
+            '200': {
+                'description': 'Account',
+                'content': {'application/json': {'schema': AccountModel}}
+            }
+        }
+    })
+    def get(self):
+        return {}
+
+
+class CompactUserResource(Resource):
+    @swagger.doc({
+        'responses': {
+            '200': {
+                'description': 'Users',
+                'content': {'application/json': {'schema': CompactUserModel.array()}}
+            }
+        }
+    })
+    def get(self):
+        return [CompactUserModel(id=1, name='somebody'), CompactUserModel(id=2, mail='somebody@example.com')]
@@ -1,4 +1,14 @@
+import gzip
 import json
+import threading
+import time
+import urllib.parse
+import zlib
+import pytest
+import flask_restful_swagger_3
+from flask_restful_swagger_3 import Extractor, Resource, Schema, swagger
+from tests.models import AccountModel
+from tests.resources import ParseResource, AccountResource, CompactUserResource
 
 
 def test_get_spec_object(test_app):
@@ -65,3 +75,442 @@ def test_request_parser_spec_definitions(test_parser):
 
     assert properties.get('password_arg') is not None
     assert properties['password_arg']['type'] == 'password'
+
+
+def test_should_validate_request_body(test_app):
+    r = test_app["app"].post('/users', json={'id': 1, 'name': 'somebody'})
+    assert r.status_code == 201
+    assert json.loads(r.data.decode('utf-8')) == {'id': 1, 'name': 'somebody'}
+
+
+def test_should_reject_invalid_request_body(test_app):
+    r = test_app["app"].post('/users', json={'id': 'one'})
+    assert r.status_code == 400
+
+    data = json.loads(r.data.decode('utf-8'))
+    assert data['message'] == 'Invalid request body'
+    assert {'path': '/id', 'message': 'must be of type "integer", but was "str"'} in data['errors']
+    assert {'path': '/name', 'message': 'is required'} in data['errors']
+
+
+def test_should_reject_missing_request_body(test_app):
+    r = test_app["app"].post('/users')
+    assert r.status_code == 400
+    assert json.loads(r.data.decode('utf-8'))['errors'] == [{'path': '/', 'message': 'is required'}]
+
+
+def test_should_prepare_swagger_rules(test_app):
+    flask_app = test_app["api"].app
+    test_app["api"]._prepare_pending_rules()
+    assert '/users/<int:user_id>' in swagger._swagger_paths
+    assert flask_app.extensions['flask-restful-swagger-3-operations']['userresource']['GET']['summary'] == \
+        'Returns a specific user.'
+    rule = next(flask_app.url_map.iter_rules('userresource'))
+    assert not [name for name in vars(rule) if name.startswith('_swagger')]
+
+    with flask_app.test_request_context('/users/1'):
+        assert swagger.get_request_swagger_path() == '/users/{user_id}'
+        assert swagger.get_request_operation()['summary'] == 'Returns a specific user.'
+
+    with flask_app.test_request_context('/users/1', method='HEAD'):
+        assert swagger.get_request_operation()['summary'] == 'Returns a specific user.'
+
+    with flask_app.test_request_context('/api/swagger.json'):
+        assert swagger.get_request_operation() is None
+
+    with flask_app.test_request_context('/unknown'):
+        assert swagger.get_request_swagger_path() is None
+
+
+def test_should_prepare_swagger_rules_once_on_concurrent_requests(new_app):
+    class SlowList(list):
+        # Widens the window between checking for pending rules and taking them
+        def __bool__(self):
+            pending = len(self) > 0
+            time.sleep(0.01)
+            return pending
+
+    resources = [(type('ParseResource{0}'.format(i), (ParseResource,), {}), '/parse{0}'.format(i)) for i in range(2)]
+    api = new_app(resources, add_api_spec_resource=False)["api"]
+    api._unprepared_rules = SlowList(api._unprepared_rules)
+    prepared = []
+    prepare = api._prepare_swagger_rules
+    api._prepare_swagger_rules = lambda *args: prepared.append(prepare(*args))
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def first_request():
+        barrier.wait()
+        try:
+            api._prepare_pending_rules()
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=first_request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(prepared) == 2
+
+
+def test_should_filter_spec_with_auth_many(test_app, monkeypatch):
+    calls = []
+
+    def auth_many(api_key, operations):
+        calls.append(api_key)
+        assert ('/users/{user_id}', 'get') in operations
+        return {operation for operation in operations if operation[0] == '/parse'}
+
+    monkeypatch.setattr(swagger, 'auth_many', auth_many)
+
+    r = test_app["app"].get('/api/swagger.json?api_key=key')
+    data = json.loads(r.data.decode('utf-8'))
+    assert list(data['paths']) == ['/parse']
+    assert calls == ['key']
+
+
+def test_should_answer_spec_with_etag(test_app):
+    r = test_app["app"].get('/api/swagger.json')
+    assert r.status_code == 200
+    etag = r.headers['ETag']
+    assert etag
+
+    r = test_app["app"].get('/api/swagger.json', headers={'If-None-Match': etag})
+    assert r.status_code == 304
+    assert r.data == b''
+
+
+def test_should_set_spec_cache_control(new_app):
+    test_app = new_app(api_spec_cache_control='public, max-age=60')
+    api, client = test_app["api"], test_app["app"]
+
+    with test_app["flask_app"].test_request_context('/api/swagger.json'):
+        r = api._swagger_endpoint().get()
+    assert r.headers['Cache-Control'] == 'public, max-age=60'
+    etag = r.headers['ETag']
+
+    # the document is rendered again when a resource is added
+    api.add_resource(ParseResource, '/more', endpoint='more')
+    r = client.get('/api/swagger.json', headers={'If-None-Match': etag})
+    assert r.status_code == 200
+    assert '/more' in json.loads(r.data.decode('utf-8'))['paths']
+
+
+def test_should_compress_spec(test_app):
+    plain = test_app["app"].get('/api/swagger.json')
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.headers['Vary'] == 'Accept-Encoding'
+
+    r = test_app["app"].get('/api/swagger.json', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert r.headers['Content-Encoding'] == 'gzip'
+    assert r.headers['Vary'] == 'Accept-Encoding'
+    assert r.headers['ETag'] != plain.headers['ETag']
+    assert gzip.decompress(r.data) == plain.data
+
+    r = test_app["app"].get('/api/swagger.json', headers={'Accept-Encoding': 'gzip;q=0, deflate'})
+    assert r.headers['Content-Encoding'] == 'deflate'
+    assert zlib.decompress(r.data) == plain.data
+
+
+def test_should_share_spec_views_between_permissions(new_app, monkeypatch):
+    test_app = new_app([(ParseResource, '/parse', '/other')])
+    api, client = test_app["api"], test_app["app"]
+
+    def auth_many(api_key, operations):
+        if api_key == 'admin':
+            return set(operations)
+        if api_key == 'nobody':
+            return set()
+        return {operation for operation in operations if operation[0] == '/parse'}
+
+    monkeypatch.setattr(swagger, 'auth_many', auth_many)
+
+    views = api._swagger_endpoint.views
+    first = client.get('/api/swagger.json?api_key=a')
+    second = client.get('/api/swagger.json?api_key=b')
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert len(views) == 1
+
+    client.get('/api/swagger.json?api_key=admin')
+    assert len(views) == 2
+
+    views.maxsize = 1
+    client.get('/api/swagger.json?api_key=nobody')
+    assert len(views) == 1
+
+
+def test_should_freeze_before_first_request(new_app):
+    test_app = new_app()
+    api = test_app["api"]
+
+    test_app["app"].get('/api/swagger.json')
+    assert api._frozen
+
+    with pytest.raises(ValueError):
+        api.add_resource(ParseResource, '/other', endpoint='other')
+
+
+def test_should_reject_unresolved_reference_on_freeze(new_app):
+    api = new_app([])["api"]
+    api.get_swagger_doc()['paths']['/missing'] = {
+        'get': {'responses': {'200': {'$ref': '#/components/responses/Missing'}}}}
+
+    with pytest.raises(swagger.ValidationError):
+        api.freeze()
+    assert not api._frozen
+
+
+def test_should_only_fail_spec_requests_on_invalid_spec(new_app):
+    test_app = new_app(servers=[{'url': 'not a url'}])
+    test_app["flask_app"].add_url_rule('/health', 'health', lambda: 'ok')
+    client = test_app["app"]
+
+    assert client.get('/health').status_code == 200
+    assert client.get('/health').status_code == 200
+    assert client.get('/api/swagger.json').status_code == 500
+    assert test_app["api"]._frozen
+
+    with pytest.raises(swagger.ValidationError):
+        test_app["api"].freeze()
+
+
+def test_should_index_paths(test_app):
+    api = test_app["api"]
+    assert api._path_index == sorted(api.get_swagger_doc()['paths'])
+    assert [path for path, _ in api.get_paths('/users')] == ['/users', '/users/{user_id}']
+    assert api.get_paths('/unknown') == []
+    assert 'get' in api.get_path_item('/users/{user_id}')
+    assert api.get_path_item('/unknown') is None
+
+
+def test_should_serve_tag_documents(new_app):
+    test_app = new_app([(ParseResource, '/parse'), (AccountResource, '/accounts')],
+                       tags=[{'name': 'account'}, {'name': 'user'}])
+    api, client = test_app["api"], test_app["app"]
+
+    data = json.loads(client.get('/api/swagger/tags/account.json').data.decode('utf-8'))
+    assert list(data['paths']) == ['/accounts']
+    assert sorted(data['components']['schemas']) == ['AccountModel', 'EmailModel', 'KeysModel']
+    assert data['tags'] == [{'name': 'account'}]
+
+    data = json.loads(client.get('/api/swagger.json?tags=user').data.decode('utf-8'))
+    assert list(data['paths']) == ['/parse']
+    assert 'components' not in data
+
+    data = json.loads(client.get('/api/swagger.json?tags=user,account').data.decode('utf-8'))
+    assert list(data['paths']) == ['/accounts', '/parse']
+
+    data = json.loads(client.get('/api/swagger.json').data.decode('utf-8'))
+    assert sorted(data['components']['schemas']) == ['AccountModel', 'EmailModel', 'KeysModel']
+    assert len(api._swagger_endpoint.views) == 4
+
+    # Unknown tags are ignored, so they share the views of the known tags
+    for i in range(3):
+        data = json.loads(client.get('/api/swagger.json?tags=user,junk{0}'.format(i)).data.decode('utf-8'))
+        assert list(data['paths']) == ['/parse']
+        client.get('/api/swagger/tags/junk{0}.json'.format(i))
+    assert len(api._swagger_endpoint.views) == 5
+
+
+def test_should_serve_spec_fragment(test_app):
+    r = test_app["app"].get('/api/swagger.json?pointer=/components/schemas/UserModel')
+    assert r.status_code == 200
+    assert json.loads(r.data.decode('utf-8'))['type'] == 'object'
+    etag = r.headers['ETag']
+    assert etag != test_app["app"].get('/api/swagger.json').headers['ETag']
+
+    r = test_app["app"].get('/api/swagger.json?pointer=/paths/~1users~1{user_id}/get/summary')
+    assert json.loads(r.data.decode('utf-8')) == 'Returns a specific user.'
+
+    r = test_app["app"].get('/api/swagger.json?pointer=/components/schemas/UserModel',
+                            headers={'If-None-Match': etag})
+    assert r.status_code == 304
+
+    r = test_app["app"].get('/api/swagger.json?pointer=/components/schemas/Unknown')
+    assert r.status_code == 404
+
+    # Array indices with leading zeros are not canonical pointers
+    assert test_app["app"].get('/api/swagger.json?pointer=/paths/~1parse/get/tags/0').status_code == 200
+    assert test_app["app"].get('/api/swagger.json?pointer=/paths/~1parse/get/tags/00').status_code == 404
+
+
+def test_should_bound_spec_fragments(test_app, monkeypatch):
+    monkeypatch.setattr(swagger.RenderedSpec, 'max_fragments', 2)
+    with test_app["context"]:
+        rendered = swagger.RenderedSpec({'a': None, 'b': [1, 2], 'c': {}})
+        assert rendered.fragment('/a').body == b'null\n'
+        assert rendered.fragment('/b/1').body == b'2\n'
+        assert rendered.fragment('/b/01') is None
+        assert rendered.fragment('/c') is not None
+    assert list(rendered._fragments) == ['/b/1', '/c']
+
+
+def test_should_serve_spec_at_hashed_url(test_app):
+    with test_app["context"]:
+        spec_hash = test_app["api"].get_spec_hash()
+
+    r = test_app["app"].get('/api/swagger.{0}.json'.format(spec_hash))
+    assert r.status_code == 200
+    assert r.headers['Cache-Control'] == swagger.IMMUTABLE_CACHE_CONTROL
+    assert r.data == test_app["app"].get('/api/swagger.json').data
+
+    r = test_app["app"].get('/api/swagger.outdated.json?tags=user')
+    assert r.status_code == 302
+    assert '/api/swagger.' in r.headers['Location']
+    assert 'tags=user' in r.headers['Location']
+
+
+def test_should_redirect_spec_to_hashed_url(new_app):
+    test_app = new_app(api_spec_redirect=True)
+    api, client = test_app["api"], test_app["app"]
+
+    r = client.get('/api/swagger.json')
+    assert r.status_code == 302
+    with test_app["flask_app"].app_context():
+        assert r.headers['Location'].endswith('/api/swagger.{0}.json'.format(api.get_spec_hash()))
+
+    r = client.get(r.headers['Location'])
+    assert r.status_code == 200
+    assert '/parse' in json.loads(r.data.decode('utf-8'))['paths']
+
+    with test_app["flask_app"].app_context():
+        hashed_url = '/api/swagger.{0}.json'.format(api.get_spec_hash())
+    for query in ('spec_hash=abc', 'tag=x'):
+        r = client.get('/api/swagger.json?' + query)
+        assert r.status_code == 302
+        assert r.headers['Location'].endswith(hashed_url)
+
+    r = client.get('/api/swagger.json?tags=user&tags=other&pointer=/paths')
+    assert r.status_code == 302
+    location = urllib.parse.urlsplit(r.headers['Location'])
+    assert location.path.endswith('.json')
+    assert urllib.parse.parse_qsl(location.query) == [('tags', 'user'), ('pointer', '/paths')]
+
+
+def test_should_export_spec(new_app, tmp_path):
+    path = str(tmp_path / 'swagger.json')
+
+    result = new_app()["flask_app"].test_cli_runner().invoke(args=['swagger', 'export', '--output', path])
+    assert result.exit_code == 0, result.output
+    with open(path, 'rb') as f:
+        body = f.read()
+    assert '/parse' in json.loads(body.decode('utf-8'))['paths']
+    with open(path + '.gz', 'rb') as f:
+        assert gzip.decompress(f.read()) == body
+
+    served_app = new_app(api_spec_file=path, api_spec_cache_control='no-cache')
+    client = served_app["app"]
+
+    r = client.get('/api/swagger.json')
+    assert r.data == body
+    assert r.headers['Cache-Control'] == 'no-cache'
+    assert r.headers['ETag']
+
+    r = client.get('/api/swagger.json', headers={'Accept-Encoding': 'gzip'})
+    assert r.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(r.data) == body
+
+    # The document of the resources is not built when it is served from a file
+    assert served_app["api"]._swagger_object['paths'] == {}
+    assert '/parse' in served_app["api"].get_swagger_doc()['paths']
+
+
+def test_should_build_spec_lazily(new_app):
+    test_app = new_app(lazy_spec=True)
+    api, client = test_app["api"], test_app["app"]
+
+    assert api._swagger_object['paths'] == {}
+    assert client.get('/unknown').status_code == 404
+    assert api._frozen
+    assert api._swagger_object['paths'] == {}
+
+    r = client.get('/api/swagger.json')
+    assert '/parse' in json.loads(r.data.decode('utf-8'))['paths']
+    assert '/parse' in api.get_swagger_doc()['paths']
+
+
+def test_should_extract_models_once():
+    class NestedModel(Schema):
+        type = 'object'
+        properties = {'id': {'type': 'integer'}}
+
+    class OuterModel(Schema):
+        type = 'object'
+        properties = {'nested': NestedModel}
+
+    def response(model):
+        return {'responses': {'200': {'description': 'Model', 'content': {'application/json': {'schema': model}}}}}
+
+    _, first = Extractor.extract(response(OuterModel))
+    _, second = Extractor.extract(response(OuterModel))
+    assert first == second
+    assert first['OuterModel'] is not second['OuterModel']
+
+    # The definitions handed out are copies of the extracted ones
+    first['OuterModel']['properties']['nested']['description'] = 'Modified'
+    assert Extractor.extract(response(OuterModel))[1] == second
+
+    # Replacing an attribute of a nested model extracts the models nesting it again
+    NestedModel.properties = {'id': {'type': 'string'}}
+    _, third = Extractor.extract(response(OuterModel))
+    assert third['NestedModel']['properties']['id']['type'] == 'string'
+
+
+def test_should_isolate_model_definitions_between_apis(new_app):
+    def get_schemas():
+        class ModelResource(Resource):
+            @swagger.doc({'responses': {'200': {'description': 'Account', 'content': {
+                'application/json': {'schema': AccountModel}}}}})
+            def get(self):
+                return {}
+
+        return new_app([(ModelResource, '/accounts')])["api"].get_swagger_doc()['components']['schemas']
+
+    first = get_schemas()
+    second = get_schemas()
+    assert first == second
+
+    first['AccountModel']['properties']['role']['enum'].append('guest')
+    first['KeysModel']['description'] = 'Modified'
+    assert second['AccountModel']['properties']['role']['enum'] == ['admin', 'user']
+    assert 'description' not in second['KeysModel']
+    assert get_schemas() == second
+
+
+def test_should_extract_recursive_models():
+    class NodeModel(Schema):
+        type = 'object'
+
+    NodeModel.properties = {'children': NodeModel.array(), 'parent': NodeModel}
+
+    operation, definitions = Extractor.extract({'responses': {'200': {
+        'description': 'Tree', 'content': {'application/json': {'schema': NodeModel}}}}})
+    assert operation['responses']['200']['content']['application/json']['schema'] == NodeModel.reference()
+    assert list(definitions) == ['NodeModel']
+    assert definitions['NodeModel']['properties']['children']['items'] == NodeModel.reference()
+    assert definitions['NodeModel']['properties']['parent'] == NodeModel.reference()
+
+
+def test_should_encode_compact_models(new_app):
+    client = new_app([(CompactUserResource, '/users')])["app"]
+
+    assert client.get('/users').get_json() == [{'id': 1, 'name': 'somebody'}, {'id': 2, 'mail': 'somebody@example.com'}]
+    schemas = client.get('/api/swagger.json').get_json()['components']['schemas']
+    assert schemas['CompactUserModel']['description'] == 'Test compact model.'
+    assert 'EmailModel' in schemas
+
+
+def test_should_read_trusted_sample_rate_from_app_config(new_app, monkeypatch):
+    monkeypatch.setattr(flask_restful_swagger_3, 'trusted_sample_rate', 0)
+    sampled = new_app([])["flask_app"]
+    sampled.config['SWAGGER_TRUSTED_SAMPLE_RATE'] = 1
+    other = new_app([])["flask_app"]
+
+    with sampled.app_context():
+        assert flask_restful_swagger_3._get_trusted_sample_rate() == 1
+    with other.app_context():
+        assert flask_restful_swagger_3._get_trusted_sample_rate() == 0
+    assert flask_restful_swagger_3._get_trusted_sample_rate() == 0
@@ -1,5 +1,12 @@
+import dataclasses
+import datetime
+import json
+import sys
+import typing
 import pytest
-from tests.models import SchemaTestModel
+import flask_restful_swagger_3
+from flask_restful_swagger_3 import Schema, RecordsError, is_model
+from tests.models import SchemaTestModel, AccountModel, Address, Member, Role, CompactUserModel
 
 
 def test_should_validate_schema_valid():
@@ -14,3 +21,303 @@ def test_should_validate_schema_missing_required():
 def test_should_validate_schema_invalid_type():
     with pytest.raises(ValueError):
         assert SchemaTestModel(**{'id': '1'})
+
+
+def test_should_validate_schema_nested_models():
+    account = AccountModel(id=1, role='admin', mail='somebody@example.com', keys=[{'name': 'key'}])
+    assert account['keys'] == [{'name': 'key'}]
+
+    with pytest.raises(ValueError, match='"mail"'):
+        AccountModel(mail='somebody')
+
+    with pytest.raises(ValueError, match='"keys/0/name"'):
+        AccountModel(keys=[{'name': 'a very long key'}])
+
+
+def test_should_validate_schema_enum_and_minimum():
+    with pytest.raises(ValueError, match='must be one of'):
+        AccountModel(role='guest')
+
+    with pytest.raises(ValueError, match='greater than or equal to 1'):
+        AccountModel(id=0)
+
+
+def test_should_validate_schema_unknown_attribute():
+    with pytest.raises(ValueError, match='does not have an attribute'):
+        AccountModel(unknown=1)
+
+
+def test_should_not_report_validator_errors_as_unknown_attributes():
+    class BrokenModel(Schema):
+        properties = {'id': {'type': 'integer'}}
+
+    def validate(value):
+        raise KeyError('other')
+
+    BrokenModel._property_validators = {'id': validate}
+    with pytest.raises(KeyError):
+        BrokenModel(id=1)
+
+
+def test_should_warn_on_model_name_collisions(caplog):
+    def define_model():
+        class CollidingModel(Schema):
+            type = 'object'
+        return CollidingModel
+
+    define_model()
+    define_model()
+    assert 'replaces' not in caplog.text
+
+    class CollidingModel(Schema):
+        type = 'object'
+
+    assert 'The model "test_should_warn_on_model_name_collisions.<locals>.CollidingModel" of tests.test_schema ' \
+           'replaces the model "test_should_warn_on_model_name_collisions.<locals>.define_model.<locals>.' \
+           'CollidingModel"' in caplog.text
+    assert flask_restful_swagger_3._models['CollidingModel'] is CollidingModel
+
+
+def test_should_warn_on_unknown_references(caplog):
+    class ReferringModel(Schema):
+        properties = {'other': {'$ref': '#/components/schemas/UnknownModel'}}
+
+    assert ReferringModel(other=1) == {'other': 1}
+    assert 'The reference "#/components/schemas/UnknownModel" is not a model' in caplog.text
+
+
+def test_should_recompile_schema_validators():
+    class DynamicModel(Schema):
+        pass
+
+    assert DynamicModel(id='1') == {}
+
+    DynamicModel.properties = {'id': {'type': 'integer'}}
+    assert DynamicModel(id=1) == {'id': 1}
+    with pytest.raises(ValueError):
+        DynamicModel(id='1')
+
+
+def test_should_validate_many():
+    records = [
+        {'id': 1, 'name': 'somebody'},
+        {'id': '2', 'name': 'somebody'},
+        {'name': 'somebody'},
+        {'id': 4, 'name': 'somebody', 'unknown': 1},
+        'not a record'
+    ]
+
+    assert SchemaTestModel.validate_many(records) == {
+        1: ['The attribute "id" must be of type "integer", but was "str"'],
+        2: ['The attribute "id" is required'],
+        3: ['The model "SchemaTestModel" does not have an attribute "unknown"'],
+        4: ['The record must be an object, but was "str"']
+    }
+
+
+def test_should_validate_many_enum():
+    assert AccountModel.validate_many([{'role': 'admin'}, {'role': 'user'}]) == {}
+    assert AccountModel.validate_many([{'role': 'admin'}, {'role': 'guest'}]) == {
+        1: ["The attribute \"role\" must be one of ['admin', 'user'], but was 'guest'"]
+    }
+
+
+def test_should_construct_from_records():
+    models = SchemaTestModel.from_records([{'id': 1, 'name': 'somebody'}, {'id': 2}])
+    assert models == [SchemaTestModel(id=1, name='somebody'), SchemaTestModel(id=2)]
+    assert all(isinstance(model, SchemaTestModel) for model in models)
+
+    with pytest.raises(RecordsError) as e:
+        SchemaTestModel.from_records([{'id': 1}, {'id': 'a'}])
+    assert list(e.value.errors) == [1]
+
+
+def test_should_create_model_from_dataclass():
+    model = Schema.from_dataclass(Member)
+    assert Schema.from_dataclass(Member) is model
+    assert model.required == ['id', 'role', 'joined', 'address']
+    assert model.properties['role'] == {'type': 'string', 'enum': ['admin', 'user']}
+    assert model.properties['joined'] == {'type': 'string', 'format': 'date'}
+    assert model.properties['friends'] == model.array()
+    assert model.properties['billing_address'] == {'allOf': [model.properties['address']], 'nullable': True}
+
+    address = model.properties['address']
+    assert issubclass(address, Schema)
+    assert address.required == ['city']
+    assert address.properties['zip'] == {'type': 'string', 'nullable': True}
+    assert 'Test dataclass' in address.__doc__
+    assert model.__doc__ is None
+
+    member = model(id=1, role='admin', joined='2020-01-01', address={'city': 'Paris'},
+                   friends=[{'id': 2, 'role': 'user', 'joined': '2020-01-02', 'address': {'city': 'Lyon'}}])
+    assert member.id == 1
+    assert model(id=1, role='admin', joined='2020-01-01', address={'city': 'Paris'}, billing_address=None)
+    assert model(id=1, role='admin', joined='2020-01-01', address={'city': 'Paris'},
+                 billing_address={'city': 'Lyon'})
+    assert member['address'] == {'city': 'Paris'}
+    with pytest.raises(AttributeError):
+        member.unknown
+
+    with pytest.raises(ValueError):
+        model(id=1, role='guest', joined='2020-01-01', address={'city': 'Paris'})
+    with pytest.raises(ValueError):
+        model(id=1, role='admin', joined='2020-01-01', address={'city': 'Paris'}, friends=[{'id': 'a'}])
+    with pytest.raises(ValueError):
+        model(id=1, role='admin', joined='2020-01-01', address={'city': 'Paris'}, billing_address={'zip': '1'})
+
+
+@pytest.mark.skipif(not hasattr(typing, 'Literal'), reason='typing.Literal requires Python 3.8')
+def test_should_create_model_from_dataclass_literal():
+    @dataclasses.dataclass
+    class Team:
+        name: str
+        kind: typing.Literal['person', 'team'] = 'team'
+
+    model = Schema.from_dataclass(Team)
+    assert model.properties['kind'] == {'type': 'string', 'enum': ['person', 'team'], 'default': 'team'}
+    with pytest.raises(ValueError):
+        model(name='a', kind='other')
+
+
+def test_should_convert_dataclass_values():
+    model = Schema.from_dataclass(Member)
+    friend = Member(id=2, role=Role.user, joined=datetime.date(2020, 1, 2), address=Address('Lyon', '69000'))
+    instance = Member(id=1, role=Role.admin, joined=datetime.date(2020, 1, 1), address=Address('Paris'),
+                      tags=['a'], friends=[friend])
+
+    member = model(**dataclasses.asdict(instance))
+    assert member['role'] == 'admin'
+    assert member['joined'] == '2020-01-01'
+    assert member['friends'][0]['address'] == {'city': 'Lyon', 'zip': '69000'}
+    assert json.dumps(member)
+    assert member.role is Role.admin
+    assert member.joined == datetime.date(2020, 1, 1)
+    assert member.address == Address('Paris')
+    assert member.billing_address is None
+    assert member.friends == [friend]
+
+    assert model.from_instance(instance) == member
+    assert model.from_instance(instance).to_instance() == instance
+    assert model(id=1, role='admin', joined='2020-01-01', address={'city': 'Paris'}).to_instance() == Member(
+        id=1, role=Role.admin, joined=datetime.date(2020, 1, 1), address=Address('Paris'))
+    with pytest.raises(ValueError):
+        model.from_instance(Address('Paris'))
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason='The unions written X | Y require Python 3.10')
+def test_should_create_model_from_dataclass_union_type():
+    @dataclasses.dataclass
+    class Event:
+        name: str
+        at: datetime.datetime | None
+        count: int | str = 0
+
+    model = Schema.from_dataclass(Event)
+    assert model.required == ['name']
+    assert model.properties['at'] == {'type': 'string', 'format': 'date-time', 'nullable': True}
+    assert model.properties['count'] == {'anyOf': [{'type': 'integer'}, {'type': 'string'}], 'default': 0}
+    event = model(name='a', at=datetime.datetime(2020, 1, 1, 12))
+    assert event.at == datetime.datetime(2020, 1, 1, 12)
+    assert model(name='a', at=None).at is None
+    with pytest.raises(ValueError):
+        model(name='a', at=1)
+
+
+def test_should_reject_non_dataclass():
+    with pytest.raises(ValueError):
+        Schema.from_dataclass(SchemaTestModel)
+
+
+def test_should_construct_compact_model():
+    model = CompactUserModel(name='somebody', id=1)
+    assert is_model(model)
+    assert is_model(CompactUserModel)
+    assert is_model(SchemaTestModel(id=1))
+    assert not is_model({})
+    assert not isinstance(model, dict)
+    assert not isinstance(model, Schema)
+    assert not issubclass(CompactUserModel, SchemaTestModel)
+    assert not hasattr(model, '__dict__')
+    assert model == {'id': 1, 'name': 'somebody'}
+    assert list(model) == ['id', 'name']
+    assert model['name'] == 'somebody'
+    assert 'mail' not in model
+    assert model.get('mail') is None
+    with pytest.raises(KeyError):
+        model['mail']
+
+    with pytest.raises(ValueError):
+        CompactUserModel(id='1')
+    with pytest.raises(ValueError):
+        CompactUserModel(name='somebody')
+    with pytest.raises(ValueError):
+        CompactUserModel(id=1, unknown=1)
+
+    records = [{'id': 1}, {'id': 2, 'mail': 'somebody@example.com'}]
+    assert CompactUserModel.from_records(records) == records
+
+
+def test_should_nest_compact_models():
+    class CompactTeamModel(Schema, compact=True):
+        type = 'object'
+        properties = {
+            'lead': CompactUserModel,
+            'members': CompactUserModel.array()
+        }
+
+    class TeamHolderModel(Schema):
+        type = 'object'
+        properties = {
+            'user': CompactUserModel,
+            'team': CompactTeamModel
+        }
+
+    user = CompactUserModel(id=1)
+    team = CompactTeamModel(lead=user, members=[user, CompactUserModel(id=2, name='somebody')])
+    holder = TeamHolderModel(user=user, team=team)
+    assert holder['team']['members'][1]['name'] == 'somebody'
+    with pytest.raises(ValueError):
+        CompactTeamModel(members=[CompactUserModel.trusted(id='1')])
+    with pytest.raises(ValueError):
+        TeamHolderModel(user=1)
+
+    records = [{'user': user, 'team': team}, {'user': CompactUserModel.trusted(name='somebody')}, team]
+    assert CompactTeamModel.validate_many([team]) == {}
+    assert list(TeamHolderModel.validate_many(records)) == [1, 2]
+    assert SchemaTestModel.from_records([CompactUserModel(id=1, name='somebody')]) == [{'id': 1, 'name': 'somebody'}]
+
+
+def test_should_not_extend_compact_model_properties():
+    with pytest.raises(ValueError):
+        CompactUserModel.properties = dict(CompactUserModel.properties, extra={'type': 'integer'})
+
+    class ExtendedModel(CompactUserModel):
+        properties = dict(CompactUserModel.properties, extra={'type': 'integer'})
+
+    assert ExtendedModel(id=1, extra=2) == {'id': 1, 'extra': 2}
+
+
+def test_should_construct_trusted_model_without_validation(monkeypatch, caplog):
+    monkeypatch.setattr(flask_restful_swagger_3, 'trusted_sample_rate', 0)
+    model = SchemaTestModel.trusted(id='1')
+    assert model == {'id': '1'}
+    assert isinstance(model, SchemaTestModel)
+    assert CompactUserModel.trusted(name='somebody') == {'name': 'somebody'}
+    assert not caplog.records
+
+    for model in (SchemaTestModel, CompactUserModel):
+        with pytest.raises(ValueError):
+            model.trusted(id=1, unknown=1)
+
+
+def test_should_log_sampled_trusted_model_errors(monkeypatch, caplog):
+    monkeypatch.setattr(flask_restful_swagger_3, 'trusted_sample_rate', 1)
+    assert SchemaTestModel.trusted(id=1) == {'id': 1}
+    assert not caplog.records
+
+    assert SchemaTestModel.trusted(name=1) == {'name': 1}
+    assert len(caplog.records) == 1
+    message = caplog.records[0].getMessage()
+    assert 'SchemaTestModel' in message
+    assert 'The attribute "name" must be of type "string"' in message
+    assert 'The attribute "id" is required' in message
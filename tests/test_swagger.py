@@ -1,5 +1,7 @@
 import pytest
+from flask import Flask, request
 from flask_restful import inputs
+from werkzeug.exceptions import HTTPException
 import flask_restful_swagger_3.swagger as swagger
 
 from tests.models import SwaggerTestModel
@@ -84,7 +86,15 @@ def test_should_get_parser_args():
         }
     ]
 
-    expected = [('name', {
+    expected = [('body', {
+        'dest': 'body',
+        'type': str,
+        'location': 'view_args',
+        'help': 'Request body',
+        'required': True,
+        'default': None,
+        'action': None
+    }), ('name', {
         'dest': 'name',
         'type': str,
         'location': 'args',
@@ -118,7 +128,15 @@ def test_array_get_parser_args():
         }
     ]
 
-    expected = [('name', {
+    expected = [('body', {
+        'dest': 'body',
+        'type': str,
+        'location': 'view_args',
+        'help': 'Request body',
+        'required': True,
+        'default': None,
+        'action': None
+    }), ('name', {
         'dest': 'name',
         'type': str,
         'location': 'args',
@@ -337,3 +355,359 @@ def test_should_parse_schema_doc():
 def test_should_parse_schema_doc_existing_description():
     test_model = SwaggerTestModel()
     assert swagger.parse_schema_doc(test_model, {'description': 'Test description'}) is None
+
+
+def test_should_build_parser_once():
+    parsers = []
+
+    @swagger.doc({
+        'parameters': [
+            {
+                'name': 'name',
+                'in': 'query',
+                'schema': {
+                    'type': 'string'
+                }
+            }
+        ],
+        'responses': {
+            '200': {
+                'description': 'Ok'
+            }
+        }
+    })
+    def get(self, _parser):
+        parsers.append(_parser)
+
+    get(None)
+    get(None)
+
+    assert isinstance(parsers[0], swagger.reqparse.RequestParser)
+    assert parsers[0] is not parsers[1]
+    assert parsers[0].args is parsers[1].args
+
+    parsers[0].add_argument('other')
+    parsers[0].replace_argument('name', type=int)
+    assert [arg.name for arg in parsers[0].args] == ['other', 'name']
+    assert [arg.name for arg in parsers[1].args] == ['name']
+    assert parsers[1].args[0].type is str
+    parsers[1].remove_argument('name')
+    assert len(parsers[1].args) == 0
+
+    get(None)
+    assert [arg.name for arg in parsers[2].args] == ['name']
+
+    parser = parsers[2].copy()
+    parser.add_argument('other')
+    assert len(parser.args) == 2
+    assert len(parsers[2].args) == 1
+
+
+FAST_PARSER_PARAMETERS = [
+    {'name': 'str', 'in': 'query', 'schema': {'type': 'string'}},
+    {'name': 'date', 'in': 'query', 'schema': {'type': 'string', 'format': 'date'}},
+    {'name': 'datetime', 'in': 'query', 'schema': {'type': 'string', 'format': 'date-time'}},
+    {'name': 'bool', 'in': 'query', 'schema': {'type': 'boolean'}},
+    {'name': 'int', 'in': 'query', 'schema': {'type': 'integer'}},
+    {'name': 'float', 'in': 'query', 'schema': {'type': 'number', 'format': 'float'}},
+    {'name': 'ids', 'in': 'query', 'schema': {'type': 'array', 'items': {'type': 'integer'}}},
+    {'name': 'missing', 'in': 'query', 'schema': {'type': 'string'}, 'default': 'default'}
+]
+
+
+def test_should_fast_parse_like_reqparse():
+    app = Flask(__name__)
+    query = 'str=a&date=2020-01-02&datetime=2020-01-02T03:04:05&bool=true&int=1&float=1.5&ids=1&ids=2'
+
+    with app.test_request_context('/?' + query):
+        expected = swagger.get_parser(FAST_PARSER_PARAMETERS).parse_args()
+        args = swagger.FastParser(FAST_PARSER_PARAMETERS).parse_args()
+
+    assert args == expected
+    assert args.ids == [1, 2]
+    assert args.missing == 'default'
+
+
+def test_should_fast_parse_enum():
+    app = Flask(__name__)
+    params = [
+        {'name': 'kind', 'in': 'query', 'schema': {'type': 'string', 'enum': ['a', 'b']}}
+    ]
+    parser = swagger.FastParser(params)
+
+    with app.test_request_context('/?kind=a'):
+        assert parser.parse_args().kind == 'a'
+
+    with app.test_request_context('/?kind=c'):
+        with pytest.raises(HTTPException) as e:
+            parser.parse_args()
+        assert e.value.code == 400
+        assert e.value.data['message'] == {'kind': 'c is not a valid choice'}
+
+        # The reqparse parser does not check enum values
+        assert swagger.get_parser(params).parse_args().kind == 'c'
+
+
+def test_should_fast_parse_strict():
+    app = Flask(__name__)
+    parser = swagger.FastParser([{'name': 'int', 'in': 'query', 'schema': {'type': 'integer'}}])
+
+    with app.test_request_context('/?int=1'):
+        assert parser.parse_args(strict=True).int == 1
+
+    with app.test_request_context('/?int=1&other=2'):
+        assert parser.parse_args().int == 1
+        with pytest.raises(HTTPException) as e:
+            parser.parse_args(strict=True)
+    assert e.value.code == 400
+    assert 'other' in e.value.description
+
+    with app.test_request_context('/?int=1', method='POST', json={'other': 2}):
+        with pytest.raises(HTTPException):
+            parser.parse_args(strict=True)
+
+
+def test_should_fast_parse_bundle_errors():
+    app = Flask(__name__)
+    params = [
+        {'name': 'int', 'in': 'query', 'schema': {'type': 'integer'}},
+        {'name': 'float', 'in': 'query', 'required': True, 'schema': {'type': 'number'}}
+    ]
+
+    with app.test_request_context('/?int=a'):
+        with pytest.raises(HTTPException) as e:
+            swagger.FastParser(params).parse_args()
+        assert list(e.value.data['message']) == ['int']
+
+        with pytest.raises(HTTPException) as e:
+            swagger.FastParser(params, bundle_errors=True).parse_args(http_error_code=422)
+        assert e.value.code == 422
+        assert sorted(e.value.data['message']) == ['float', 'int']
+
+        app.config['BUNDLE_ERRORS'] = True
+        with pytest.raises(HTTPException) as e:
+            swagger.FastParser(params).parse_args()
+        assert sorted(e.value.data['message']) == ['float', 'int']
+
+
+def test_should_fast_parse_missing_required():
+    app = Flask(__name__)
+    parser = swagger.FastParser([
+        {'name': 'int', 'in': 'query', 'required': True, 'schema': {'type': 'integer'}}
+    ])
+
+    with app.test_request_context('/?int=a'):
+        with pytest.raises(HTTPException) as e:
+            parser.parse_args()
+    assert e.value.code == 400
+
+    with app.test_request_context('/'):
+        with pytest.raises(HTTPException) as e:
+            parser.parse_args()
+    assert e.value.data['message'] == {'int': 'Missing required parameter in the query string'}
+
+
+def test_should_get_parser_args_locations():
+    params = [
+        {'name': 'X-Version', 'in': 'header', 'schema': {'type': 'integer'}},
+        {'name': 'session', 'in': 'cookie', 'schema': {'type': 'string'}},
+        {'name': 'user_id', 'in': 'path', 'schema': {'type': 'integer'}}
+    ]
+
+    assert [arg[1]['location'] for arg in swagger.get_parser_args(params)] == ['headers', 'cookies', 'view_args']
+
+
+def test_should_parse_header_cookie_and_path_parameters():
+    app = Flask(__name__)
+    app.add_url_rule('/users/<user_id>', 'user')
+    params = [
+        {'name': 'X-Version', 'in': 'header', 'schema': {'type': 'integer'}},
+        {'name': 'session', 'in': 'cookie', 'schema': {'type': 'string'}},
+        {'name': 'user_id', 'in': 'path', 'schema': {'type': 'integer'}},
+        {'name': 'name', 'in': 'query', 'schema': {'type': 'string'}}
+    ]
+    expected = {'X-Version': 2, 'session': 'abc', 'user_id': 5, 'name': 'x'}
+
+    with app.test_request_context('/users/5?name=x', headers={'X-Version': '2', 'Cookie': 'session=abc'}):
+        assert swagger.get_parser(params).parse_args() == expected
+        assert swagger.FastParser(params).parse_args() == expected
+
+
+def test_should_parse_parameters_without_schema_as_strings():
+    app = Flask(__name__)
+    params = [
+        {'name': 'X-Trace', 'in': 'header'},
+        {'name': 'session', 'in': 'cookie', 'schema': {'$ref': '#/components/schemas/Session'}}
+    ]
+
+    with app.test_request_context('/', headers={'X-Trace': 'd', 'Cookie': 'session=abc'}):
+        assert swagger.get_parser(params).parse_args() == {'X-Trace': 'd', 'session': 'abc'}
+        assert swagger.FastParser(params).parse_args() == {'X-Trace': 'd', 'session': 'abc'}
+
+
+def test_should_fast_parse_missing_required_header():
+    app = Flask(__name__)
+    parser = swagger.FastParser([
+        {'name': 'X-Version', 'in': 'header', 'required': True, 'schema': {'type': 'integer'}}
+    ])
+
+    with app.test_request_context('/'):
+        with pytest.raises(HTTPException) as e:
+            parser.parse_args()
+    assert e.value.data['message'] == {'X-Version': 'Missing required parameter in the HTTP headers'}
+
+
+def test_should_compile_schema():
+    validate = swagger.compile_schema({
+        'type': 'object',
+        'properties': {
+            'id': {'type': 'integer', 'minimum': 1},
+            'name': {'type': 'string', 'maxLength': 4},
+            'kind': {'type': 'string', 'enum': ['a', 'b']},
+            'tags': {'type': 'array', 'items': {'type': 'string'}},
+            'born': {'type': 'string', 'format': 'date'},
+            'mail': {'$ref': '#/components/schemas/Email'}
+        },
+        'required': ['id']
+    }, resolve=lambda ref: {'type': 'string', 'format': 'email'})
+
+    assert validate({'id': 1, 'name': 'abc', 'kind': 'a', 'tags': ['x'], 'born': '2020-01-01',
+                     'mail': 'a@b.com'}) is None
+    assert validate([]) == [('', 'must be of type "object", but was "list"')]
+    assert sorted(validate({'id': 0, 'name': 'abcde', 'kind': 'c', 'tags': [1], 'born': 'x', 'mail': 'x'})) == [
+        ('/born', "must be a valid \"date\", but was 'x'"),
+        ('/id', 'must be greater than or equal to 1'),
+        ('/kind', "must be one of ['a', 'b'], but was 'c'"),
+        ('/mail', "must be a valid \"email\", but was 'x'"),
+        ('/name', 'must be at most 4 characters long'),
+        ('/tags/0', 'must be of type "string", but was "int"')
+    ]
+    assert validate({}) == [('/id', 'is required')]
+
+
+def test_should_compile_schema_model():
+    validate = swagger.compile_schema(SwaggerTestModel.array())
+
+    assert validate([{'id': 'a'}]) is None
+    assert validate([{'id': 1}]) == [('/0/id', 'must be of type "string", but was "int"')]
+
+
+def test_should_cache_auth_decisions():
+    calls = []
+    now = [0]
+
+    def auth(api_key, endpoint, method):
+        calls.append((api_key, endpoint, method))
+        return api_key == 'key'
+
+    cache = swagger.AuthCache(maxsize=2, ttl=10, timer=lambda: now[0])
+
+    assert cache.authorize(auth, 'key', '/users', 'get')
+    assert cache.authorize(auth, 'key', '/users', 'get')
+    assert not cache.authorize(auth, 'other', '/users', 'get')
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+    # Least recently used decision is evicted
+    cache.authorize(auth, 'key', '/groups', 'get')
+    assert len(cache) == 2
+    cache.authorize(auth, 'key', '/users', 'get')
+    assert len(calls) == 4
+
+    # Decisions expire
+    now[0] = 11
+    cache.authorize(auth, 'key', '/users', 'get')
+    assert len(calls) == 5
+
+
+def test_should_invalidate_auth_decisions():
+    def auth(api_key, endpoint, method):
+        return True
+
+    cache = swagger.AuthCache()
+    cache.authorize(auth, 'key', '/users', 'get')
+    cache.authorize(auth, 'key', '/groups', 'get')
+    cache.authorize(auth, 'other', '/users', 'get')
+
+    cache.invalidate(api_key='key', endpoint='/users')
+    assert len(cache) == 2
+    cache.invalidate(api_key='key')
+    assert len(cache) == 1
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_should_use_auth_cache(monkeypatch):
+    calls = []
+
+    def auth(api_key, endpoint, method):
+        calls.append(api_key)
+        return True
+
+    monkeypatch.setattr(swagger, 'auth', auth)
+    monkeypatch.setattr(swagger, 'auth_cache', swagger.AuthCache())
+
+    assert swagger._auth('key', '/users', 'get')
+    assert swagger._auth('key', '/users', 'get')
+    assert calls == ['key']
+
+
+def test_should_dedupe_schemas():
+    envelope = {
+        'type': 'object',
+        'properties': {
+            'code': {'type': 'integer'},
+            'message': {'type': 'string'},
+            'details': {'type': 'array', 'items': {'type': 'string'}}
+        }
+    }
+
+    def response(schema):
+        return {'description': 'Response', 'content': {'application/json': {'schema': schema}}}
+
+    first = {'get': {'responses': {'400': response(dict(envelope))}}}
+    second = {'get': {'responses': {'400': response(dict(envelope)),
+                                    '200': response({'type': 'array', 'items': dict(envelope)}),
+                                    '201': response({'type': 'string'})}}}
+    swagger_object = {'paths': {'/first': first, '/second': second}, 'components': {'schemas': {}}}
+
+    names = swagger.dedupe_schemas(swagger_object)
+    assert len(names) == 1
+    ref = {'$ref': '#/components/schemas/' + names[0]}
+    assert swagger_object['components']['schemas'][names[0]] == envelope
+
+    paths = swagger_object['paths']
+    assert paths['/first']['get']['responses']['400']['content']['application/json']['schema'] == ref
+    assert paths['/second']['get']['responses']['200']['content']['application/json']['schema']['items'] == ref
+    assert paths['/second']['get']['responses']['201']['content']['application/json']['schema'] == {'type': 'string'}
+
+    # The original path items are not modified
+    assert first['get']['responses']['400']['content']['application/json']['schema'] == envelope
+    assert swagger.dedupe_schemas(swagger_object) == []
+
+
+def test_should_not_validate_form_request_body():
+    app = Flask(__name__)
+    schema = {'type': 'object', 'properties': {'a': {'type': 'integer'}}, 'required': ['a']}
+    form_only = swagger.RequestBodyValidator({
+        'required': True,
+        'content': {'application/x-www-form-urlencoded': {'schema': schema}}
+    })
+    json_or_form = swagger.RequestBodyValidator({
+        'required': True,
+        'content': {'application/json': {'schema': schema}, 'multipart/form-data': {'schema': schema}}
+    })
+
+    for validator in (form_only, json_or_form):
+        with app.test_request_context('/', method='POST', data={'a': '1'}):
+            validator.validate()
+            assert request.form['a'] == '1'
+
+    with app.test_request_context('/', method='POST'):
+        with pytest.raises(HTTPException) as e:
+            json_or_form.validate()
+        assert e.value.data['errors'] == [{'path': '/', 'message': 'is required'}]
+
+    with app.test_request_context('/', method='POST', json={'a': 'one'}):
+        with pytest.raises(HTTPException):
+            json_or_form.validate()